@@ -1,12 +1,29 @@
 import arcade
+import pyglet
 import random
 from enum import Enum
 from dataclasses import dataclass, field
-import math
+from typing import NamedTuple
+from functools import cached_property, partial
+from itertools import accumulate
+from collections import deque
+from threading import Thread
 import os
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 768
+SCREEN_CENTER_X = SCREEN_WIDTH // 2
+SCREEN_CENTER_Y = SCREEN_HEIGHT // 2
 TITLE = "Crypt Knight"
 
 TILE_SIZE = 32
@@ -17,6 +34,14 @@ ROOM_MIN_SIZE = 5
 ROOM_MAX_SIZE = 12
 MAX_ROOMS = 15
 
+FOV_RADIUS = 8
+CAMERA_LERP = 0.1
+DRAW_RATE = 1 / 60
+STATIC_DRAW_RATE = 1 / 2
+PARTICLE_LIFE = 30
+MAX_PARTICLES = 64
+WANDER_STEPS = np.array([(0, 1), (0, -1), (1, 0), (-1, 0)])
+
 ASSETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
 IMAGES_PATH = os.path.join(ASSETS_PATH, "images")
 SOUNDS_PATH = os.path.join(ASSETS_PATH, "sounds")
@@ -61,6 +86,19 @@ class TileType(Enum):
     DOOR = 3
 
 
+WALL = TileType.WALL.value
+FLOOR = TileType.FLOOR.value
+STAIRS = TileType.STAIRS.value
+DOOR = TileType.DOOR.value
+
+TILE_LOOK = {
+    WALL: ('wall', (50, 50, 60), (25, 25, 35)),
+    FLOOR: ('floor', (35, 35, 45), (20, 20, 28)),
+    STAIRS: ('stairs', (25, 60, 25), (20, 20, 28)),
+    DOOR: ('floor', (35, 35, 45), (20, 20, 28)),
+}
+
+
 class ItemType(Enum):
     HEALTH_POTION = "health_potion"
     MANA_POTION = "mana_potion"
@@ -73,6 +111,85 @@ class ItemType(Enum):
     GOLD = "gold"
 
 
+RARITY_COLORS = {
+    1: arcade.color.WHITE,
+    2: arcade.color.GREEN,
+    3: arcade.color.BLUE,
+    4: arcade.color.PURPLE,
+    5: arcade.color.ORANGE,
+}
+
+ITEM_SYMBOLS = {
+    ItemType.HEALTH_POTION: "+",
+    ItemType.MANA_POTION: "*",
+    ItemType.SWORD: "/",
+    ItemType.SHIELD: "O",
+    ItemType.ARMOR: "A",
+    ItemType.RING: "o",
+    ItemType.SCROLL_FIREBALL: "~",
+    ItemType.SCROLL_TELEPORT: "?",
+    ItemType.GOLD: "$",
+}
+
+VALUED_ITEM_TYPES = frozenset((ItemType.HEALTH_POTION, ItemType.MANA_POTION, ItemType.SWORD, ItemType.SHIELD, ItemType.ARMOR))
+
+ITEM_TEXTURES = {
+    ItemType.HEALTH_POTION: 'health_potion',
+    ItemType.MANA_POTION: 'mana_potion',
+    ItemType.SWORD: 'sword',
+    ItemType.SHIELD: 'shield',
+    ItemType.ARMOR: 'armor',
+    ItemType.GOLD: 'gold',
+    ItemType.RING: 'ring',
+    ItemType.SCROLL_FIREBALL: 'scroll',
+    ItemType.SCROLL_TELEPORT: 'scroll',
+}
+
+class EnemyTemplate(NamedTuple):
+    name: str
+    hp: int
+    attack: int
+    defense: int
+    exp_value: int
+    symbol: str
+    color: tuple
+    texture: str = 'goblin'
+    is_boss: bool = False
+    
+    def scaled(self, mult):
+        return self._replace(
+            hp=int(self.hp * mult),
+            attack=int(self.attack * mult),
+            defense=int(self.defense * mult),
+            exp_value=int(self.exp_value * mult),
+        )
+
+
+ENEMY_TYPES = [
+    EnemyTemplate("Крыса", 15, 4, 1, 10, "r", arcade.color.BROWN, 'rat'),
+    EnemyTemplate("Гоблин", 25, 6, 2, 20, "g", arcade.color.GREEN, 'goblin'),
+    EnemyTemplate("Орк", 40, 10, 4, 40, "O", arcade.color.DARK_GREEN, 'orc'),
+    EnemyTemplate("Скелет", 30, 8, 3, 30, "s", arcade.color.WHITE, 'skeleton'),
+    EnemyTemplate("Зомби", 50, 7, 2, 35, "z", arcade.color.GRAY, 'zombie'),
+    EnemyTemplate("Тролль", 70, 15, 6, 60, "T", arcade.color.DARK_OLIVE_GREEN, 'troll'),
+    EnemyTemplate("Тёмный маг", 45, 18, 3, 55, "M", arcade.color.PURPLE, 'mage'),
+    EnemyTemplate("Демон", 80, 20, 8, 80, "D", arcade.color.DARK_RED, 'demon'),
+]
+
+ITEM_TEMPLATES = [
+    (ItemType.HEALTH_POTION, "Зелье здоровья", 25, 1, 30),
+    (ItemType.MANA_POTION, "Зелье маны", 20, 1, 25),
+    (ItemType.GOLD, "Золото", 0, 1, 40),
+    (ItemType.SWORD, "Меч", 5, 2, 15),
+    (ItemType.SHIELD, "Щит", 3, 2, 12),
+    (ItemType.ARMOR, "Броня", 4, 2, 10),
+    (ItemType.RING, "Кольцо силы", 2, 3, 8),
+    (ItemType.SCROLL_FIREBALL, "Свиток огня", 30, 3, 5),
+    (ItemType.SCROLL_TELEPORT, "Свиток телепорта", 0, 2, 5),
+]
+ITEM_CUM_WEIGHTS = list(accumulate(t[4] for t in ITEM_TEMPLATES))
+
+
 class HeroClass(Enum):
     WARRIOR = ("Воин", 120, 30, 15, 8, 3)
     MAGE = ("Маг", 70, 100, 8, 15, 5)
@@ -88,12 +205,28 @@ class HeroClass(Enum):
         self.base_defense = defense
 
 
+HERO_CLASSES = tuple(HeroClass)
+
+EQUIPMENT_SLOTS = (('weapon', 'Оружие'), ('armor', 'Броня'), ('shield', 'Щит'), ('ring', 'Кольцо'))
+HUD_BARS = (
+    (20, SCREEN_HEIGHT - 55, 200, 18, arcade.color.RED, arcade.color.DARK_RED),
+    (20, SCREEN_HEIGHT - 78, 200, 14, arcade.color.BLUE, arcade.color.DARK_BLUE),
+    (240, SCREEN_HEIGHT - 55, 150, 14, arcade.color.YELLOW, arcade.color.DARK_GOLDENROD),
+)
+MENU_FALLBACK_COLOR = arcade.color.DARK_SLATE_GRAY
+PANEL_BORDER_COLOR = arcade.color.GOLD
+HUD_FORMATS = ("%s Ур.%d", "ОЗ: %d/%d", "Мана: %d/%d", "Опыт: %d/%d", "АТК:%d ЗАЩ:%d МАГ:%d", "Золото: %d", "Этаж: %d/%d", "Ход: %d")
+GAME_OVER_STAT_FORMATS = ("Класс: %s", "Уровень: %d", "Этаж подземелья: %d", "Собрано золота: %d", "Сделано ходов: %d")
+VICTORY_STAT_FORMATS = ("Класс: %s", "Финальный уровень: %d", "Золото: %d", "Ходов: %d")
+
+
 @dataclass
 class Room:
     x: int
     y: int
     width: int
     height: int
+    walkable: np.ndarray = field(default=None, repr=False)
     
     @property
     def center(self):
@@ -102,12 +235,6 @@ class Room:
     @property
     def inner(self):
         return (self.x + 1, self.y + 1, self.x + self.width - 1, self.y + self.height - 1)
-    
-    def intersects(self, other):
-        return (self.x <= other.x + other.width + 1 and
-                self.x + self.width + 1 >= other.x and
-                self.y <= other.y + other.height + 1 and
-                self.y + self.height + 1 >= other.y)
 
 
 @dataclass
@@ -121,47 +248,103 @@ class Item:
     sprite: arcade.Sprite = None
     
     def get_color(self):
-        rarity_colors = {
-            1: arcade.color.WHITE,
-            2: arcade.color.GREEN,
-            3: arcade.color.BLUE,
-            4: arcade.color.PURPLE,
-            5: arcade.color.ORANGE,
-        }
-        return rarity_colors.get(self.rarity, arcade.color.WHITE)
+        return RARITY_COLORS.get(self.rarity, arcade.color.WHITE)
     
     def get_symbol(self):
-        symbols = {
-            ItemType.HEALTH_POTION: "+",
-            ItemType.MANA_POTION: "*",
-            ItemType.SWORD: "/",
-            ItemType.SHIELD: "O",
-            ItemType.ARMOR: "A",
-            ItemType.RING: "o",
-            ItemType.SCROLL_FIREBALL: "~",
-            ItemType.SCROLL_TELEPORT: "?",
-            ItemType.GOLD: "$",
-        }
-        return symbols.get(self.item_type, "?")
+        return ITEM_SYMBOLS.get(self.item_type, "?")
+    
+    @cached_property
+    def display_text(self):
+        if self.item_type in VALUED_ITEM_TYPES:
+            return f"{self.name} (+{self.value})"
+        return self.name
+    
+    @cached_property
+    def display_color(self):
+        return self.get_color()
 
 
-@dataclass
-class Enemy:
-    x: int
-    y: int
-    name: str
-    hp: int
-    max_hp: int
-    attack: int
-    defense: int
-    exp_value: int
-    symbol: str
-    color: tuple
-    is_boss: bool = False
-    sprite: arcade.Sprite = None
+class EnemyPool:
+    def __init__(self, templates=(), capacity=0, width=MAP_WIDTH, height=MAP_HEIGHT):
+        self.templates = list(templates)
+        self.template_exp_value = np.array([t.exp_value for t in self.templates], dtype=np.int32)
+        self.count = 0
+        self.template = np.zeros(capacity, dtype=np.int8)
+        self.x = np.zeros(capacity, dtype=np.int16)
+        self.y = np.zeros(capacity, dtype=np.int16)
+        self.hp = np.zeros(capacity, dtype=np.int32)
+        self.sprites = []
+        self.grid = np.full((width, height), -1, dtype=np.int16)
+        self.visible = np.zeros(0, dtype=np.intp)
+    
+    def add(self, x, y, template, sprite=None):
+        i = self.count
+        self.template[i] = template
+        self.x[i] = x
+        self.y[i] = y
+        self.hp[i] = self.templates[template].hp
+        self.sprites.append(sprite)
+        self.grid[x, y] = i
+        self.count += 1
+        return i
     
-    def is_alive(self):
+    def kind(self, i):
+        return self.templates[self.template[i]]
+    
+    def alive(self):
         return self.hp > 0
+    
+    def update_visible(self, visible):
+        n = self.count
+        self.visible = np.flatnonzero(self.alive()[:n] & visible[self.x[:n], self.y[:n]])
+    
+    def visible_alive(self):
+        return self.visible[self.hp[self.visible] > 0]
+    
+    def closest_visible(self, px, py):
+        if HAS_NUMBA:
+            return closest_visible_enemy(self.visible, self.x, self.y, self.hp, px, py)
+        
+        targets = self.visible_alive()
+        if not targets.size:
+            return -1
+        dist = np.abs(self.x[targets].astype(np.int32) - px) + np.abs(self.y[targets].astype(np.int32) - py)
+        return int(targets[dist.argmin()])
+    
+    def at(self, x, y):
+        i = self.grid[x, y]
+        if i >= 0 and self.hp[i] > 0:
+            return int(i)
+        return -1
+
+
+class ParticlePool:
+    def __init__(self, capacity=MAX_PARTICLES):
+        self.head = 0
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.life = np.zeros(capacity, dtype=np.int16)
+        self.texts = [''] * capacity
+        self.rgb = [None] * capacity
+    
+    def add(self, x, y, text, color, life=PARTICLE_LIFE):
+        i = self.head
+        self.x[i] = x
+        self.y[i] = y
+        self.life[i] = life
+        self.texts[i] = text
+        self.rgb[i] = tuple(color[:3])
+        self.head = (i + 1) % len(self.life)
+    
+    def active(self):
+        return np.flatnonzero(self.life > 0)
+    
+    def update(self):
+        alive = self.life > 0
+        if not alive.any():
+            return
+        np.subtract(self.life, 1, out=self.life, where=alive)
+        np.add(self.y, 1, out=self.y, where=alive)
 
 
 @dataclass
@@ -181,7 +364,12 @@ class Player:
     exp_to_next: int = 100
     gold: int = 0
     inventory: list = field(default_factory=list)
-    equipped: dict = field(default_factory=dict)
+    weapon: Item = None
+    armor: Item = None
+    shield: Item = None
+    ring: Item = None
+    total_attack: int = 0
+    total_defense: int = 0
     sprite: arcade.Sprite = None
     
     def __post_init__(self):
@@ -192,7 +380,7 @@ class Player:
         self.attack = self.hero_class.base_attack
         self.defense = self.hero_class.base_defense
         self.magic = self.hero_class.base_magic
-        self.equipped = {'weapon': None, 'armor': None, 'shield': None, 'ring': None}
+        self.recompute_equipment_bonuses()
     
     def gain_exp(self, amount):
         self.exp += amount
@@ -204,48 +392,171 @@ class Player:
         return leveled_up
     
     def level_up(self):
+        randint = random.randint
         self.level += 1
         self.exp_to_next = int(self.exp_to_next * 1.5)
-        hp_gain = random.randint(5, 15)
-        mana_gain = random.randint(3, 10)
+        hp_gain = randint(5, 15)
+        mana_gain = randint(3, 10)
         self.max_hp += hp_gain
         self.hp = min(self.hp + hp_gain, self.max_hp)
         self.max_mana += mana_gain
         self.mana = min(self.mana + mana_gain, self.max_mana)
-        self.attack += random.randint(1, 3)
-        self.defense += random.randint(1, 2)
-        self.magic += random.randint(1, 3)
+        self.attack += randint(1, 3)
+        self.defense += randint(1, 2)
+        self.magic += randint(1, 3)
+        self.recompute_equipment_bonuses()
+    
+    def equip(self, slot, item):
+        old = getattr(self, slot)
+        setattr(self, slot, item)
+        self.recompute_equipment_bonuses()
+        return old
+    
+    def recompute_equipment_bonuses(self):
+        self.total_attack = self.attack
+        if self.weapon:
+            self.total_attack += self.weapon.value
+        self.total_defense = self.defense
+        if self.armor:
+            self.total_defense += self.armor.value
+        if self.shield:
+            self.total_defense += self.shield.value
     
     def get_total_attack(self):
-        bonus = 0
-        if self.equipped['weapon']:
-            bonus += self.equipped['weapon'].value
-        return self.attack + bonus
+        return self.total_attack
     
     def get_total_defense(self):
-        bonus = 0
-        if self.equipped['armor']:
-            bonus += self.equipped['armor'].value
-        if self.equipped['shield']:
-            bonus += self.equipped['shield'].value
-        return self.defense + bonus
-    
-    def is_alive(self):
-        return self.hp > 0
+        return self.total_defense
+
+
+FOV_OCTANTS = np.array([
+    (1, 0, 0, -1),
+    (0, 1, -1, 0),
+    (0, -1, -1, 0),
+    (-1, 0, 0, -1),
+    (-1, 0, 0, 1),
+    (0, -1, 1, 0),
+    (0, 1, 1, 0),
+    (1, 0, 0, 1),
+])
+
+
+@njit(cache=True)
+def shadowcast_fov(tiles, visible, explored, px, py, radius):
+    width, height = tiles.shape
+    radius_sq = radius * radius
+    visible[px, py] = True
+    explored[px, py] = True
+    
+    for octant in range(8):
+        xx, xy, yx, yy = FOV_OCTANTS[octant, 0], FOV_OCTANTS[octant, 1], FOV_OCTANTS[octant, 2], FOV_OCTANTS[octant, 3]
+        stack = [(1, 1.0, 0.0)]
+        while stack:
+            row, start, end = stack.pop()
+            if start < end:
+                continue
+            new_start = start
+            for j in range(row, radius + 1):
+                dy = -j
+                blocked = False
+                for dx in range(-j, 1):
+                    left_slope = (dx - 0.5) / (dy + 0.5)
+                    right_slope = (dx + 0.5) / (dy - 0.5)
+                    if start < right_slope:
+                        continue
+                    if end > left_slope:
+                        break
+                    
+                    x = px + dx * xx + dy * xy
+                    y = py + dx * yx + dy * yy
+                    inside = 0 <= x < width and 0 <= y < height
+                    if inside and dx * dx + dy * dy < radius_sq:
+                        visible[x, y] = True
+                        explored[x, y] = True
+                    
+                    opaque = not inside or tiles[x, y] == WALL
+                    if blocked:
+                        if opaque:
+                            new_start = right_slope
+                        else:
+                            blocked = False
+                            start = new_start
+                    elif opaque and j < radius:
+                        blocked = True
+                        stack.append((j + 1, start, left_slope))
+                        new_start = right_slope
+                if blocked:
+                    break
+
+
+@njit(cache=True)
+def closest_visible_enemy(targets, xs, ys, hp, px, py):
+    best = -1
+    best_dist = 0
+    for i in targets:
+        if hp[i] <= 0:
+            continue
+        dist = abs(xs[i] - px) + abs(ys[i] - py)
+        if best < 0 or dist < best_dist:
+            best = i
+            best_dist = dist
+    return best
+
+
+@njit(cache=True)
+def resolve_enemy_moves(active, new_x, new_y, xs, ys, hp, grid, tiles, px, py):
+    width, height = tiles.shape
+    attacks = np.zeros(active.size, dtype=np.bool_)
+    for k in range(active.size):
+        i = active[k]
+        x = new_x[k]
+        y = new_y[k]
+        if x == px and y == py:
+            attacks[k] = True
+            continue
+        if x < 0 or x >= width or y < 0 or y >= height or tiles[x, y] == WALL:
+            continue
+        occupant = grid[x, y]
+        if occupant >= 0 and hp[occupant] > 0:
+            continue
+        if grid[xs[i], ys[i]] == i:
+            grid[xs[i], ys[i]] = -1
+        xs[i] = x
+        ys[i] = y
+        grid[x, y] = i
+    return attacks
+
+
+def warm_up_kernels():
+    tiles = np.full((3, 3), FLOOR, dtype=np.uint8)
+    seen = np.zeros((3, 3), dtype=bool)
+    shadowcast_fov(tiles, seen, seen.copy(), 1, 1, 1)
+    
+    none = np.zeros(0, dtype=np.int64)
+    coords = np.zeros(0, dtype=np.int16)
+    grid = np.full((3, 3), -1, dtype=np.int16)
+    hp = np.zeros(0, dtype=np.int32)
+    closest_visible_enemy(np.zeros(0, dtype=np.intp), coords, coords, hp, 1, 1)
+    resolve_enemy_moves(none, none, none, coords, coords, hp, grid, tiles, 1, 1)
 
 
 class DungeonGenerator:
     def __init__(self, width, height):
         self.width = width
         self.height = height
-        self.tiles = [[TileType.WALL for _ in range(height)] for _ in range(width)]
+        self.tiles = np.full((width, height), WALL, dtype=np.uint8)
         self.rooms = []
-        self.explored = [[False for _ in range(height)] for _ in range(width)]
-        self.visible = [[False for _ in range(height)] for _ in range(width)]
+        self.explored = np.zeros((width, height), dtype=bool)
+        self.visible = np.zeros((width, height), dtype=bool)
+        self.reserved = np.zeros((width, height), dtype=bool)
     
     def generate(self, dungeon_level):
-        self.tiles = [[TileType.WALL for _ in range(self.height)] for _ in range(self.width)]
+        self.tiles.fill(WALL)
+        self.explored.fill(False)
+        self.visible.fill(False)
+        self.reserved.fill(False)
         self.rooms = []
+        reserved = self.reserved
         
         for _ in range(MAX_ROOMS):
             w = random.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
@@ -255,7 +566,8 @@ class DungeonGenerator:
             
             new_room = Room(x, y, w, h)
             
-            if not any(new_room.intersects(other) for other in self.rooms):
+            if not reserved[x:x + w + 1, y:y + h + 1].any():
+                reserved[x - 1:x + w + 2, y - 1:y + h + 2] = True
                 self._create_room(new_room)
                 
                 if self.rooms:
@@ -274,55 +586,32 @@ class DungeonGenerator:
         if self.rooms:
             last_room = self.rooms[-1]
             cx, cy = last_room.center
-            self.tiles[cx][cy] = TileType.STAIRS
+            self.tiles[cx, cy] = STAIRS
+        
+        for room in self.rooms:
+            x1, y1, x2, y2 = room.inner
+            room.walkable = np.argwhere(self.tiles[x1:x2, y1:y2] == FLOOR) + (x1, y1)
         
         return self.rooms[0].center if self.rooms else (self.width // 2, self.height // 2)
     
     def _create_room(self, room):
         x1, y1, x2, y2 = room.inner
-        for x in range(x1, x2):
-            for y in range(y1, y2):
-                if 0 <= x < self.width and 0 <= y < self.height:
-                    self.tiles[x][y] = TileType.FLOOR
+        self.tiles[x1:x2, y1:y2] = FLOOR
     
     def _create_h_tunnel(self, x1, x2, y):
-        for x in range(min(x1, x2), max(x1, x2) + 1):
-            if 0 <= x < self.width and 0 <= y < self.height:
-                self.tiles[x][y] = TileType.FLOOR
+        self.tiles[min(x1, x2):max(x1, x2) + 1, y] = FLOOR
     
     def _create_v_tunnel(self, y1, y2, x):
-        for y in range(min(y1, y2), max(y1, y2) + 1):
-            if 0 <= x < self.width and 0 <= y < self.height:
-                self.tiles[x][y] = TileType.FLOOR
+        self.tiles[x, min(y1, y2):max(y1, y2) + 1] = FLOOR
     
     def is_walkable(self, x, y):
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.tiles[x][y] in [TileType.FLOOR, TileType.STAIRS, TileType.DOOR]
+            return self.tiles[x, y] != WALL
         return False
     
-    def compute_fov(self, player_x, player_y, radius=8):
-        self.visible = [[False for _ in range(self.height)] for _ in range(self.width)]
-        
-        for angle in range(360):
-            rad = math.radians(angle)
-            dx = math.cos(rad)
-            dy = math.sin(rad)
-            x, y = float(player_x), float(player_y)
-            
-            for _ in range(radius):
-                ix, iy = int(x), int(y)
-                
-                if 0 <= ix < self.width and 0 <= iy < self.height:
-                    self.visible[ix][iy] = True
-                    self.explored[ix][iy] = True
-                    
-                    if self.tiles[ix][iy] == TileType.WALL:
-                        break
-                else:
-                    break
-                
-                x += dx
-                y += dy
+    def compute_fov(self, player_x, player_y, radius=FOV_RADIUS):
+        self.visible.fill(False)
+        shadowcast_fov(self.tiles, self.visible, self.explored, player_x, player_y, radius)
 
 
 class GameState(Enum):
@@ -336,6 +625,66 @@ class GameState(Enum):
     PAUSED = "paused"
 
 
+STATIC_STATES = frozenset({GameState.GAME_OVER, GameState.VICTORY})
+
+TUTORIAL_CONTROLS = (
+    ("W / Стрелка вверх", "Движение вверх"),
+    ("S / Стрелка вниз", "Движение вниз"),
+    ("A / Стрелка влево", "Движение влево"),
+    ("D / Стрелка вправо", "Движение вправо"),
+    ("ПРОБЕЛ", "Ждать (пропустить ход)"),
+    ("ENTER", "Спуститься по лестнице"),
+    ("I", "Открыть инвентарь"),
+    ("1", "Заклинание исцеления (20 маны)"),
+    ("2", "Огненный шар (30 маны)"),
+    ("ESC", "Пауза"),
+)
+
+TUTORIAL_ENEMIES = (
+    ("Крыса", arcade.color.BROWN, "Слабая, но быстрая.", 'rat'),
+    ("Гоблин", arcade.color.GREEN, "Обычное существо подземелья.", 'goblin'),
+    ("Орк", arcade.color.DARK_GREEN, "Сильный воин.", 'orc'),
+    ("Скелет", arcade.color.WHITE, "Нежить со средними характеристиками.", 'skeleton'),
+    ("Зомби", arcade.color.GRAY, "Медленный, но живучий.", 'zombie'),
+    ("Тролль", arcade.color.DARK_OLIVE_GREEN, "Огромный зверь. Очень опасен!", 'troll'),
+    ("Тёмный маг", arcade.color.PURPLE, "Мощные магические атаки.", 'mage'),
+    ("Демон", arcade.color.DARK_RED, "Элитный враг.", 'demon'),
+)
+
+TUTORIAL_ITEMS = (
+    ("Зелье здоровья", arcade.color.RED, "Восстанавливает ОЗ.", 'health_potion'),
+    ("Зелье маны", arcade.color.BLUE, "Восстанавливает ману.", 'mana_potion'),
+    ("Золото", arcade.color.GOLD, "Валюта.", 'gold'),
+    ("Меч", arcade.color.SILVER, "Увеличивает урон.", 'sword'),
+    ("Щит", arcade.color.LIGHT_GRAY, "Увеличивает защиту.", 'shield'),
+    ("Броня", arcade.color.BRONZE, "Добавляет защиту.", 'armor'),
+    ("Кольцо", arcade.color.PURPLE, "Магическое кольцо.", 'ring'),
+    ("Свиток огня", arcade.color.ORANGE, "Урон всем видимым врагам!", 'scroll'),
+    ("Свиток телепорта", arcade.color.CYAN, "Перемещает в случайную комнату.", 'scroll'),
+)
+
+TUTORIAL_LORE = (
+    "В древнем королевстве Вальдория существовало подземелье,",
+    "настолько глубокое и опасное, что никто из вошедших",
+    "не возвращался обратно.",
+    "",
+    "Бездонные Глубины, как его стали называть, хранили",
+    "несметные богатства и могущественные артефакты",
+    "забытой эпохи. Но также там обитали невыразимые ужасы -",
+    "существа тьмы, питающиеся душами храбрецов.",
+    "",
+    "Вы - один из немногих искателей приключений, достаточно",
+    "смелых, чтобы бросить вызов глубинам. Вооружённый лишь",
+    "своими навыками и отвагой, вы должны пройти через",
+    "10 этажей возрастающей опасности.",
+    "",
+    "На дне ждёт источник всего зла этих земель.",
+    "Победите его - и станете легендой.",
+    "",
+    "Да пребудет с вами удача. Ваше путешествие начинается...",
+)
+
+
 class TutorialPage(Enum):
     CONTROLS = 0
     ENEMIES = 1
@@ -343,18 +692,19 @@ class TutorialPage(Enum):
     LORE = 3
 
 
+TUTORIAL_PAGE_COUNT = len(TutorialPage)
+
+
 class MessageLog:
     def __init__(self, max_messages=6):
-        self.messages = []
+        self.messages = deque(maxlen=max_messages)
         self.max_messages = max_messages
     
     def add(self, text, color=arcade.color.WHITE):
         self.messages.append((text, color))
-        if len(self.messages) > self.max_messages:
-            self.messages.pop(0)
     
     def clear(self):
-        self.messages = []
+        self.messages.clear()
 
 
 class TextureManager:
@@ -481,9 +831,11 @@ class DungeonRogue(arcade.Window):
         
         self.state = GameState.MENU
         self.dungeon = None
+        if HAS_NUMBA:
+            Thread(target=warm_up_kernels, daemon=True).start()
         self.player = None
-        self.enemies = []
-        self.items = []
+        self.enemies = EnemyPool()
+        self.items = {}
         self.dungeon_level = 1
         self.max_dungeon_level = 8
         self.message_log = MessageLog()
@@ -491,22 +843,56 @@ class DungeonRogue(arcade.Window):
         self.camera_y = 0
         self.selected_class_index = 0
         self.selected_inventory_index = 0
-        self.particle_effects = []
+        self.particle_effects = ParticlePool()
         self.turn_count = 0
+        self.rng = np.random.default_rng()
         
         self.tutorial_page = TutorialPage.CONTROLS
         self.selected_hero_class = None
         
         self.textures = TextureManager()
+        self.item_textures = {
+            item_type: self.textures.get(self._get_item_texture_name(item_type))
+            for item_type in ItemType
+            if self.textures.has(self._get_item_texture_name(item_type))
+        }
         self.music = MusicManager()
         self.current_music_state = None
         
+        self.keymap = self._build_keymap()
+        self.camera = arcade.Camera2D()
+        self.tile_sprites = arcade.SpriteList()
+        self.fog_sprites = arcade.SpriteList()
+        self.tile_looks = {}
+        self.shown_tiles = np.full((MAP_WIDTH, MAP_HEIGHT), -1, dtype=np.int16)
+        self.shown_visible = np.zeros((MAP_WIDTH, MAP_HEIGHT), dtype=bool)
+        self.shown_fog = np.zeros((MAP_WIDTH, MAP_HEIGHT), dtype=bool)
+        self.shown_window = None
+        self._build_tile_sprites()
+        self.item_sprites = arcade.SpriteList(lazy=True)
+        self.enemy_sprites = arcade.SpriteList(lazy=True)
+        self.hp_bar_sprites = arcade.SpriteList(lazy=True)
+        self.enemy_bars = []
+        self.player_sprites = arcade.SpriteList(lazy=True)
+        self.inventory_icons = arcade.SpriteList(lazy=True)
+        for i in range(12):
+            icon = arcade.Sprite(center_x=SCREEN_CENTER_X - 215, center_y=SCREEN_CENTER_Y + 5 - i * 22)
+            icon.visible = False
+            self.inventory_icons.append(icon)
+        self.inventory_icon_types = ()
+        self._build_static_texts()
+        self._build_static_shapes()
+        self.screen_cache = self.ctx.framebuffer(color_attachments=[self.ctx.texture(self.get_framebuffer_size())])
+        self.screen_quad = arcade.gl.geometry.quad_2d_fs()
+        self.cached_screen_state = None
+        self.throttled = False
+        
     def setup(self):
         self.dungeon_level = 1
         self.message_log.clear()
-        self.enemies = []
-        self.items = []
-        self.particle_effects = []
+        self.enemies = EnemyPool()
+        self.items = {}
+        self.particle_effects = ParticlePool()
         self.turn_count = 0
         self._update_music()
     
@@ -520,50 +906,148 @@ class DungeonRogue(arcade.Window):
                 self.music.play("game.mp3")
                 self.current_music_state = "game"
     
-    def _get_enemy_texture_name(self, enemy_name):
-        name_map = {
-            'Крыса': 'rat',
-            'Гоблин': 'goblin',
-            'Орк': 'orc',
-            'Скелет': 'skeleton',
-            'Зомби': 'zombie',
-            'Тролль': 'troll',
-            'Тёмный маг': 'mage',
-            'Демон': 'demon',
-        }
-        return name_map.get(enemy_name, 'goblin')
-    
     def _get_item_texture_name(self, item_type):
-        type_map = {
-            ItemType.HEALTH_POTION: 'health_potion',
-            ItemType.MANA_POTION: 'mana_potion',
-            ItemType.SWORD: 'sword',
-            ItemType.SHIELD: 'shield',
-            ItemType.ARMOR: 'armor',
-            ItemType.GOLD: 'gold',
-            ItemType.RING: 'ring',
-            ItemType.SCROLL_FIREBALL: 'scroll',
-            ItemType.SCROLL_TELEPORT: 'scroll',
-        }
-        return type_map.get(item_type, 'gold')
+        return ITEM_TEXTURES.get(item_type, 'gold')
+    
+    def _make_sprite(self, tex_name, size, x, y, sprite_list):
+        if not self.textures.has(tex_name):
+            return None
+        sprite = arcade.Sprite()
+        sprite.texture = self.textures.get(tex_name)
+        sprite.width = size
+        sprite.height = size
+        sprite.position = (x * TILE_SIZE + TILE_SIZE // 2, y * TILE_SIZE + TILE_SIZE // 2)
+        sprite_list.append(sprite)
+        return sprite
+    
+    def _build_tile_sprites(self):
+        blank = arcade.SpriteSolidColor(TILE_SIZE, TILE_SIZE).texture
+        self.tile_looks = {
+            tile: (self.textures.get(tex_name), arcade.color.WHITE, dark_color) if self.textures.has(tex_name) else (blank, color, dark_color)
+            for tile, (tex_name, color, dark_color) in TILE_LOOK.items()
+        }
+        half = TILE_SIZE // 2
+        tiles, fogs = [], []
+        
+        for x in range(MAP_WIDTH):
+            center_x = x * TILE_SIZE + half
+            for y in range(MAP_HEIGHT):
+                center_y = y * TILE_SIZE + half
+                sprite = arcade.SpriteSolidColor(TILE_SIZE, TILE_SIZE, center_x, center_y)
+                sprite.visible = False
+                tiles.append(sprite)
+                
+                fog = arcade.SpriteSolidColor(TILE_SIZE, TILE_SIZE, center_x, center_y)
+                fog.visible = False
+                fogs.append(fog)
+        
+        self.tile_sprites.extend(tiles)
+        self.fog_sprites.extend(fogs)
+    
+    def _reset_tile_sprites(self):
+        tile_sprites = self.tile_sprites
+        fog_sprites = self.fog_sprites
+        for i in np.flatnonzero(self.shown_visible | self.shown_fog).tolist():
+            tile_sprites[i].visible = False
+            fog_sprites[i].visible = False
+        self.shown_visible.fill(False)
+        self.shown_fog.fill(False)
+        self.shown_window = None
+        
+        tiles = self.dungeon.tiles
+        changed = np.flatnonzero(tiles != self.shown_tiles)
+        looks = self.tile_looks
+        for i, tile in zip(changed.tolist(), tiles.ravel()[changed].tolist()):
+            texture, color, dark_color = looks[tile]
+            sprite = tile_sprites[i]
+            sprite.texture = texture
+            sprite.size = (TILE_SIZE, TILE_SIZE)
+            sprite.color = color
+            fog_sprites[i].color = dark_color
+        self.shown_tiles[...] = tiles
+    
+    def _update_fov(self):
+        self.dungeon.compute_fov(self.player.x, self.player.y)
+        self.enemies.update_visible(self.dungeon.visible)
+    
+    def _sync_tiles(self):
+        px, py = self.player.x, self.player.y
+        x0, x1 = max(px - FOV_RADIUS, 0), px + FOV_RADIUS + 1
+        y0, y1 = max(py - FOV_RADIUS, 0), py + FOV_RADIUS + 1
+        if self.shown_window:
+            sx0, sx1, sy0, sy1 = self.shown_window
+            x0, x1, y0, y1 = min(x0, sx0), max(x1, sx1), min(y0, sy0), max(y1, sy1)
+        self.shown_window = (max(px - FOV_RADIUS, 0), px + FOV_RADIUS + 1, max(py - FOV_RADIUS, 0), py + FOV_RADIUS + 1)
+        
+        visible = self.dungeon.visible[x0:x1, y0:y1]
+        fog = self.dungeon.explored[x0:x1, y0:y1] & ~visible
+        shown_visible = self.shown_visible[x0:x1, y0:y1]
+        shown_fog = self.shown_fog[x0:x1, y0:y1]
+        xs, ys = np.nonzero((visible != shown_visible) | (fog != shown_fog))
+        
+        height = self.dungeon.height
+        tile_sprites = self.tile_sprites
+        fog_sprites = self.fog_sprites
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            i = (x + x0) * height + y + y0
+            tile_sprites[i].visible = bool(visible[x, y])
+            fog_sprites[i].visible = bool(fog[x, y])
+        
+        shown_visible[...] = visible
+        shown_fog[...] = fog
+    
+    def _sync_sprites(self):
+        self._sync_tiles()
+        visible = self.dungeon.visible
+        enemies = self.enemies
+        n = enemies.count
+        shown = np.zeros(n, dtype=bool)
+        shown[enemies.visible_alive()] = True
+        hp_width = TILE_SIZE - 4
+        half = TILE_SIZE // 2
+        templates = enemies.templates
+        columns = zip(enemies.x[:n].tolist(), enemies.y[:n].tolist(), enemies.hp[:n].tolist(), enemies.template[:n].tolist(), shown.tolist(), enemies.sprites, self.enemy_bars)
+        for x, y, hp, template, show, sprite, (back, front) in columns:
+            center_x = x * TILE_SIZE + half
+            center_y = y * TILE_SIZE + half
+            if sprite:
+                sprite.visible = show
+                sprite.position = (center_x, center_y)
+            
+            back.visible = show
+            front.visible = show
+            if show:
+                kind = templates[template]
+                bar_y = center_y + (TILE_SIZE * 1.2 if kind.is_boss else TILE_SIZE) / 2 + 4
+                fill = max(1, int(hp_width * hp / kind.hp))
+                back.position = (center_x, bar_y)
+                front.width = fill
+                front.position = (center_x - hp_width / 2 + fill / 2, bar_y)
+        
+        for item in self.items.values():
+            if item.sprite:
+                item.sprite.visible = bool(visible[item.x, item.y])
+        
+        player = self.player
+        if player.sprite:
+            player.sprite.position = (player.x * TILE_SIZE + half, player.y * TILE_SIZE + half)
     
     def start_new_game(self, hero_class):
         self.setup()
-        self.dungeon = DungeonGenerator(MAP_WIDTH, MAP_HEIGHT)
+        if self.dungeon is None:
+            self.dungeon = DungeonGenerator(MAP_WIDTH, MAP_HEIGHT)
         start_pos = self.dungeon.generate(self.dungeon_level)
+        self._reset_tile_sprites()
         
         self.player = Player(x=start_pos[0], y=start_pos[1], hero_class=hero_class)
         
-        if self.textures.has('player'):
-            self.player.sprite = arcade.Sprite()
-            self.player.sprite.texture = self.textures.get('player')
-            self.player.sprite.width = TILE_SIZE
-            self.player.sprite.height = TILE_SIZE
+        self.player_sprites.clear()
+        self.player.sprite = self._make_sprite('player', TILE_SIZE, self.player.x, self.player.y, self.player_sprites)
         
         self._spawn_enemies()
         self._spawn_items()
         
-        self.dungeon.compute_fov(self.player.x, self.player.y)
+        self._update_fov()
         self.state = GameState.PLAYING
         self._update_music()
         
@@ -571,115 +1055,72 @@ class DungeonRogue(arcade.Window):
         self.message_log.add("Найдите лестницу, чтобы спуститься глубже...", arcade.color.GRAY)
     
     def _spawn_enemies(self):
-        self.enemies = []
-        
-        enemy_types = [
-            ("Крыса", 15, 4, 1, 10, "r", arcade.color.BROWN),
-            ("Гоблин", 25, 6, 2, 20, "g", arcade.color.GREEN),
-            ("Орк", 40, 10, 4, 40, "O", arcade.color.DARK_GREEN),
-            ("Скелет", 30, 8, 3, 30, "s", arcade.color.WHITE),
-            ("Зомби", 50, 7, 2, 35, "z", arcade.color.GRAY),
-            ("Тролль", 70, 15, 6, 60, "T", arcade.color.DARK_OLIVE_GREEN),
-            ("Тёмный маг", 45, 18, 3, 55, "M", arcade.color.PURPLE),
-            ("Демон", 80, 20, 8, 80, "D", arcade.color.DARK_RED),
-        ]
-        
-        available_enemies = enemy_types[:min(len(enemy_types), 2 + self.dungeon_level)]
         num_enemies = 5 + self.dungeon_level * 2
+        level_mult = 1 + (self.dungeon_level - 1) * 0.15
+        templates = [t.scaled(level_mult) for t in ENEMY_TYPES[:2 + self.dungeon_level]]
+        boss = len(templates)
+        templates.append(EnemyTemplate(
+            name=f"Босс {self.dungeon_level} уровня",
+            hp=150 + self.dungeon_level * 30,
+            attack=20 + self.dungeon_level * 3,
+            defense=10 + self.dungeon_level * 2,
+            exp_value=200 + self.dungeon_level * 50,
+            symbol="B",
+            color=arcade.color.CRIMSON,
+            texture='demon',
+            is_boss=True,
+        ))
+        
+        self.enemies = EnemyPool(templates, num_enemies + 1, self.dungeon.width, self.dungeon.height)
+        self.enemy_sprites.clear()
+        
+        if self.dungeon_level % 5 == 0 and self.dungeon.rooms:
+            boss_room = self.dungeon.rooms[-2] if len(self.dungeon.rooms) > 1 else self.dungeon.rooms[-1]
+            cx, cy = boss_room.center
+            sprite = self._make_sprite('demon', TILE_SIZE * 1.2, cx, cy, self.enemy_sprites)
+            self.enemies.add(cx, cy, boss, sprite)
+        
+        rng = self.rng
         
         for room in self.dungeon.rooms[1:]:
             if num_enemies <= 0:
                 break
-            enemies_in_room = random.randint(1, min(3, num_enemies))
+            enemies_in_room = int(rng.integers(1, min(3, num_enemies), endpoint=True))
+            cells = room.walkable[rng.choice(len(room.walkable), size=enemies_in_room, replace=False)]
+            picks = rng.integers(boss, size=enemies_in_room)
             
-            for _ in range(enemies_in_room):
-                if num_enemies <= 0:
-                    break
-                
-                x = random.randint(room.x + 1, room.x + room.width - 2)
-                y = random.randint(room.y + 1, room.y + room.height - 2)
-                
-                if self.dungeon.is_walkable(x, y) and not self._is_occupied(x, y):
-                    template = random.choice(available_enemies)
-                    level_mult = 1 + (self.dungeon_level - 1) * 0.15
-                    
-                    enemy = Enemy(
-                        x=x, y=y,
-                        name=template[0],
-                        hp=int(template[1] * level_mult),
-                        max_hp=int(template[1] * level_mult),
-                        attack=int(template[2] * level_mult),
-                        defense=int(template[3] * level_mult),
-                        exp_value=int(template[4] * level_mult),
-                        symbol=template[5],
-                        color=template[6]
-                    )
-                    
-                    tex_name = self._get_enemy_texture_name(template[0])
-                    if self.textures.has(tex_name):
-                        enemy.sprite = arcade.Sprite()
-                        enemy.sprite.texture = self.textures.get(tex_name)
-                        enemy.sprite.width = TILE_SIZE
-                        enemy.sprite.height = TILE_SIZE
-                    
-                    self.enemies.append(enemy)
+            for (x, y), pick in zip(cells.tolist(), picks.tolist()):
+                if not self._is_occupied(x, y):
+                    sprite = self._make_sprite(templates[pick].texture, TILE_SIZE, x, y, self.enemy_sprites)
+                    self.enemies.add(x, y, pick, sprite)
                     num_enemies -= 1
         
-        if self.dungeon_level % 5 == 0 and self.dungeon.rooms:
-            boss_room = self.dungeon.rooms[-2] if len(self.dungeon.rooms) > 1 else self.dungeon.rooms[-1]
-            cx, cy = boss_room.center
-            
-            boss = Enemy(
-                x=cx, y=cy,
-                name=f"Босс {self.dungeon_level} уровня",
-                hp=150 + self.dungeon_level * 30,
-                max_hp=150 + self.dungeon_level * 30,
-                attack=20 + self.dungeon_level * 3,
-                defense=10 + self.dungeon_level * 2,
-                exp_value=200 + self.dungeon_level * 50,
-                symbol="B",
-                color=arcade.color.CRIMSON,
-                is_boss=True
-            )
-            
-            if self.textures.has('demon'):
-                boss.sprite = arcade.Sprite()
-                boss.sprite.texture = self.textures.get('demon')
-                boss.sprite.width = TILE_SIZE * 1.5
-                boss.sprite.height = TILE_SIZE * 1.5
-            
-            self.enemies.append(boss)
+        self.hp_bar_sprites.clear()
+        self.enemy_bars = []
+        for _ in range(self.enemies.count):
+            back = arcade.SpriteSolidColor(TILE_SIZE - 4, 4, color=arcade.color.DARK_RED)
+            front = arcade.SpriteSolidColor(TILE_SIZE - 4, 4, color=arcade.color.RED)
+            self.hp_bar_sprites.extend((back, front))
+            self.enemy_bars.append((back, front))
     
     def _spawn_items(self):
-        self.items = []
-        
-        item_templates = [
-            (ItemType.HEALTH_POTION, "Зелье здоровья", 25, 1, 30),
-            (ItemType.MANA_POTION, "Зелье маны", 20, 1, 25),
-            (ItemType.GOLD, "Золото", 0, 1, 40),
-            (ItemType.SWORD, "Меч", 5, 2, 15),
-            (ItemType.SHIELD, "Щит", 3, 2, 12),
-            (ItemType.ARMOR, "Броня", 4, 2, 10),
-            (ItemType.RING, "Кольцо силы", 2, 3, 8),
-            (ItemType.SCROLL_FIREBALL, "Свиток огня", 30, 3, 5),
-            (ItemType.SCROLL_TELEPORT, "Свиток телепорта", 0, 2, 5),
-        ]
+        self.items = {}
+        self.item_sprites.clear()
         
         num_items = 8 + self.dungeon_level
+        templates = iter(random.choices(ITEM_TEMPLATES, cum_weights=ITEM_CUM_WEIGHTS, k=num_items))
+        rng = self.rng
         
         for room in self.dungeon.rooms:
-            items_in_room = random.randint(0, 2)
+            items_in_room = int(rng.integers(0, 2, endpoint=True))
+            cells = room.walkable[rng.choice(len(room.walkable), size=items_in_room, replace=False)]
             
-            for _ in range(items_in_room):
+            for x, y in cells.tolist():
                 if num_items <= 0:
                     break
                 
-                x = random.randint(room.x + 1, room.x + room.width - 2)
-                y = random.randint(room.y + 1, room.y + room.height - 2)
-                
-                if self.dungeon.is_walkable(x, y) and not self._is_occupied(x, y):
-                    weights = [t[4] for t in item_templates]
-                    template = random.choices(item_templates, weights=weights)[0]
+                if not self._is_occupied(x, y):
+                    template = next(templates)
                     
                     value = template[2]
                     rarity = template[3]
@@ -699,23 +1140,15 @@ class DungeonRogue(arcade.Window):
                         rarity=rarity
                     )
                     
-                    tex_name = self._get_item_texture_name(template[0])
-                    if self.textures.has(tex_name):
-                        item.sprite = arcade.Sprite()
-                        item.sprite.texture = self.textures.get(tex_name)
-                        item.sprite.width = TILE_SIZE * 0.7
-                        item.sprite.height = TILE_SIZE * 0.7
+                    item.sprite = self._make_sprite(self._get_item_texture_name(template[0]), TILE_SIZE * 0.7, x, y, self.item_sprites)
                     
-                    self.items.append(item)
+                    self.items[x, y] = item
                     num_items -= 1
     
     def _is_occupied(self, x, y):
         if self.player and self.player.x == x and self.player.y == y:
             return True
-        for enemy in self.enemies:
-            if enemy.x == x and enemy.y == y and enemy.is_alive():
-                return True
-        return False
+        return self.enemies.at(x, y) >= 0
     
     def next_level(self):
         self.dungeon_level += 1
@@ -724,8 +1157,8 @@ class DungeonRogue(arcade.Window):
             self.state = GameState.VICTORY
             return
         
-        self.dungeon = DungeonGenerator(MAP_WIDTH, MAP_HEIGHT)
         start_pos = self.dungeon.generate(self.dungeon_level)
+        self._reset_tile_sprites()
         
         self.player.x = start_pos[0]
         self.player.y = start_pos[1]
@@ -737,7 +1170,7 @@ class DungeonRogue(arcade.Window):
         self._spawn_enemies()
         self._spawn_items()
         
-        self.dungeon.compute_fov(self.player.x, self.player.y)
+        self._update_fov()
         
         self.message_log.add(f"Этаж {self.dungeon_level}!", arcade.color.GOLD)
         self.message_log.add(f"Восстановлено {heal_amount} ОЗ", arcade.color.GREEN)
@@ -749,339 +1182,354 @@ class DungeonRogue(arcade.Window):
         new_x = self.player.x + dx
         new_y = self.player.y + dy
         
-        for enemy in self.enemies:
-            if enemy.x == new_x and enemy.y == new_y and enemy.is_alive():
-                self.attack_enemy(enemy)
-                self._enemy_turn()
-                return
+        target = self.enemies.at(new_x, new_y)
+        if target >= 0:
+            self.attack_enemy(target)
+            self._enemy_turn()
+            return
         
         if self.dungeon.is_walkable(new_x, new_y):
             self.player.x = new_x
             self.player.y = new_y
             
-            if self.dungeon.tiles[new_x][new_y] == TileType.STAIRS:
+            if self.dungeon.tiles[new_x, new_y] == STAIRS:
                 self.message_log.add("Нажмите ENTER чтобы спуститься", arcade.color.LIME_GREEN)
             
             self._pickup_items()
-            self.dungeon.compute_fov(self.player.x, self.player.y)
+            self._update_fov()
             self._enemy_turn()
             self.turn_count += 1
     
-    def attack_enemy(self, enemy):
-        damage = max(1, self.player.get_total_attack() - enemy.defense + random.randint(-2, 2))
-        
-        crit = random.random() < 0.15
+    def attack_enemy(self, index):
+        randint = random.randint
+        rnd = random.random
+        enemies = self.enemies
+        kind = enemies.kind(index)
+        name = kind.name
+        damage = max(1, self.player.get_total_attack() - kind.defense + randint(-2, 2))
+        
+        crit = rnd() < 0.15
         if crit:
             damage *= 2
-            self.message_log.add(f"КРИТ! {enemy.name} получает {damage} урона!", arcade.color.ORANGE)
+            self.message_log.add(f"КРИТ! {name} получает {damage} урона!", arcade.color.ORANGE)
         else:
-            self.message_log.add(f"{enemy.name} получает {damage} урона", arcade.color.WHITE)
+            self.message_log.add(f"{name} получает {damage} урона", arcade.color.WHITE)
         
-        enemy.hp -= damage
+        enemies.hp[index] -= damage
         
-        self.particle_effects.append({
-            'x': enemy.x * TILE_SIZE,
-            'y': enemy.y * TILE_SIZE,
-            'text': f"-{damage}",
-            'color': arcade.color.ORANGE if crit else arcade.color.RED,
-            'life': 30
-        })
+        self.particle_effects.add(
+            int(enemies.x[index]) * TILE_SIZE,
+            int(enemies.y[index]) * TILE_SIZE,
+            f"-{damage}",
+            arcade.color.ORANGE if crit else arcade.color.RED
+        )
         
-        if not enemy.is_alive():
-            self.message_log.add(f"{enemy.name} повержен! +{enemy.exp_value} опыта", arcade.color.YELLOW)
+        if enemies.hp[index] <= 0:
+            exp_value = kind.exp_value
+            self.message_log.add(f"{name} повержен! +{exp_value} опыта", arcade.color.YELLOW)
             
-            if self.player.gain_exp(enemy.exp_value):
+            if self.player.gain_exp(exp_value):
                 self.message_log.add(f"НОВЫЙ УРОВЕНЬ! Теперь уровень {self.player.level}!", arcade.color.GOLD)
             
-            if random.random() < 0.4:
-                gold = random.randint(5, 20) * self.dungeon_level
+            if rnd() < 0.4:
+                gold = randint(5, 20) * self.dungeon_level
                 self.player.gold += gold
                 self.message_log.add(f"+{gold} золота", arcade.color.GOLD)
     
     def _enemy_turn(self):
-        for enemy in self.enemies:
-            if not enemy.is_alive():
-                continue
-            
-            if not self.dungeon.visible[enemy.x][enemy.y]:
-                continue
-            
-            dx = 0
-            dy = 0
-            
-            if enemy.x < self.player.x:
-                dx = 1
-            elif enemy.x > self.player.x:
-                dx = -1
-            
-            if enemy.y < self.player.y:
-                dy = 1
-            elif enemy.y > self.player.y:
-                dy = -1
-            
-            if random.random() < 0.3:
-                dx, dy = random.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
+        randint = random.randint
+        enemies = self.enemies
+        px, py = self.player.x, self.player.y
+        
+        active = enemies.visible_alive()
+        if active.size == 0:
+            return
+        
+        ex = enemies.x[active]
+        ey = enemies.y[active]
+        dx = np.sign(px - ex)
+        dy = np.sign(py - ey)
+        
+        wander = self.rng.random(active.size) < 0.3
+        steps = WANDER_STEPS[self.rng.integers(len(WANDER_STEPS), size=active.size)]
+        dx = np.where(wander, steps[:, 0], dx)
+        dy = np.where(wander, steps[:, 1], dy)
+        
+        attacks = resolve_enemy_moves(
+            active, ex + dx, ey + dy,
+            enemies.x, enemies.y, enemies.hp, enemies.grid,
+            self.dungeon.tiles, px, py
+        )
+        enemies.update_visible(self.dungeon.visible)
+        
+        player = self.player
+        total_defense = player.get_total_defense()
+        log_add = self.message_log.add
+        popup_add = self.particle_effects.add
+        
+        for i in active[attacks].tolist():
+            kind = enemies.kind(i)
+            damage = max(1, kind.attack - total_defense + randint(-2, 2))
+            player.hp -= damage
             
-            new_x = enemy.x + dx
-            new_y = enemy.y + dy
+            color = arcade.color.RED if kind.is_boss else arcade.color.LIGHT_CORAL
+            log_add(f"{kind.name} наносит {damage} урона!", color)
             
-            if new_x == self.player.x and new_y == self.player.y:
-                damage = max(1, enemy.attack - self.player.get_total_defense() + random.randint(-2, 2))
-                self.player.hp -= damage
-                
-                color = arcade.color.RED if enemy.is_boss else arcade.color.LIGHT_CORAL
-                self.message_log.add(f"{enemy.name} наносит {damage} урона!", color)
-                
-                self.particle_effects.append({
-                    'x': self.player.x * TILE_SIZE,
-                    'y': self.player.y * TILE_SIZE,
-                    'text': f"-{damage}",
-                    'color': arcade.color.RED,
-                    'life': 30
-                })
-                
-                if not self.player.is_alive():
-                    self.state = GameState.GAME_OVER
-                    self.message_log.add("Вы погибли!", arcade.color.RED)
+            popup_add(px * TILE_SIZE, py * TILE_SIZE, f"-{damage}", arcade.color.RED)
             
-            elif self.dungeon.is_walkable(new_x, new_y) and not self._is_occupied(new_x, new_y):
-                enemy.x = new_x
-                enemy.y = new_y
+            if player.hp <= 0:
+                self.state = GameState.GAME_OVER
+                log_add("Вы погибли!", arcade.color.RED)
     
     def _pickup_items(self):
-        items_to_remove = []
+        player = self.player
+        item = self.items.get((player.x, player.y))
+        if item is None:
+            return
         
-        for item in self.items:
-            if item.x == self.player.x and item.y == self.player.y:
-                if item.item_type == ItemType.GOLD:
-                    self.player.gold += item.value
-                    self.message_log.add(f"+{item.value} золота", arcade.color.GOLD)
-                else:
-                    if len(self.player.inventory) < 20:
-                        self.player.inventory.append(item)
-                        self.message_log.add(f"Подобрано: {item.name}", item.get_color())
-                    else:
-                        self.message_log.add("Инвентарь полон!", arcade.color.RED)
-                        continue
-                
-                items_to_remove.append(item)
+        if item.item_type == ItemType.GOLD:
+            player.gold += item.value
+            self.message_log.add(f"+{item.value} золота", arcade.color.GOLD)
+        elif len(player.inventory) < 20:
+            player.inventory.append(item)
+            self.message_log.add(f"Подобрано: {item.name}", item.get_color())
+        else:
+            self.message_log.add("Инвентарь полон!", arcade.color.RED)
+            return
         
-        for item in items_to_remove:
-            self.items.remove(item)
+        del self.items[player.x, player.y]
+        if item.sprite:
+            item.sprite.remove_from_sprite_lists()
     
     def use_item(self, index):
-        if index >= len(self.player.inventory):
+        if not 0 <= index < len(self.player.inventory):
             return
         
-        item = self.player.inventory[index]
-        
-        if item.item_type == ItemType.HEALTH_POTION:
-            heal = item.value + self.player.level * 5
-            self.player.hp = min(self.player.hp + heal, self.player.max_hp)
-            self.player.inventory.pop(index)
-            self.message_log.add(f"Восстановлено {heal} ОЗ", arcade.color.GREEN)
-        
-        elif item.item_type == ItemType.MANA_POTION:
-            restore = item.value + self.player.level * 3
-            self.player.mana = min(self.player.mana + restore, self.player.max_mana)
-            self.player.inventory.pop(index)
-            self.message_log.add(f"Восстановлено {restore} маны", arcade.color.BLUE)
-        
-        elif item.item_type == ItemType.SCROLL_FIREBALL:
-            damage = item.value + self.player.magic
-            count = 0
-            for enemy in self.enemies:
-                if enemy.is_alive() and self.dungeon.visible[enemy.x][enemy.y]:
-                    enemy.hp -= damage
-                    count += 1
-                    if not enemy.is_alive():
-                        self.player.gain_exp(enemy.exp_value)
-            self.player.inventory.pop(index)
-            self.message_log.add(f"Огненный шар поражает {count} врагов!", arcade.color.ORANGE)
-        
-        elif item.item_type == ItemType.SCROLL_TELEPORT:
-            if self.dungeon.rooms:
-                room = random.choice(self.dungeon.rooms)
-                self.player.x, self.player.y = room.center
-                self.dungeon.compute_fov(self.player.x, self.player.y)
-                self.player.inventory.pop(index)
-                self.message_log.add("Телепортация!", arcade.color.CYAN)
-        
-        elif item.item_type == ItemType.SWORD:
-            old = self.player.equipped['weapon']
-            self.player.equipped['weapon'] = item
-            self.player.inventory.pop(index)
-            if old:
-                self.player.inventory.append(old)
-            self.message_log.add(f"Экипировано: {item.name}", arcade.color.WHITE)
-        
-        elif item.item_type == ItemType.SHIELD:
-            old = self.player.equipped['shield']
-            self.player.equipped['shield'] = item
-            self.player.inventory.pop(index)
-            if old:
-                self.player.inventory.append(old)
-            self.message_log.add(f"Экипировано: {item.name}", arcade.color.WHITE)
-        
-        elif item.item_type == ItemType.ARMOR:
-            old = self.player.equipped['armor']
-            self.player.equipped['armor'] = item
-            self.player.inventory.pop(index)
-            if old:
-                self.player.inventory.append(old)
-            self.message_log.add(f"Экипировано: {item.name}", arcade.color.WHITE)
-        
-        elif item.item_type == ItemType.RING:
-            old = self.player.equipped['ring']
-            self.player.equipped['ring'] = item
-            self.player.inventory.pop(index)
-            if old:
-                self.player.inventory.append(old)
-            self.message_log.add(f"Экипировано: {item.name}", arcade.color.WHITE)
+        inventory = self.player.inventory
+        item = inventory[index]
+        handler = self._USE_HANDLERS.get(item.item_type)
+        if handler and handler(self, item):
+            del inventory[index]
+    
+    def _use_health_potion(self, item):
+        heal = item.value + self.player.level * 5
+        self.player.hp = min(self.player.hp + heal, self.player.max_hp)
+        self.message_log.add(f"Восстановлено {heal} ОЗ", arcade.color.GREEN)
+        return True
+    
+    def _use_mana_potion(self, item):
+        restore = item.value + self.player.level * 3
+        self.player.mana = min(self.player.mana + restore, self.player.max_mana)
+        self.message_log.add(f"Восстановлено {restore} маны", arcade.color.BLUE)
+        return True
+    
+    def _use_fireball_scroll(self, item):
+        player = self.player
+        damage = item.value + player.magic
+        enemies = self.enemies
+        hit = enemies.visible_alive()
+        enemies.hp[hit] -= damage
+        killed = hit[enemies.hp[hit] <= 0]
+        gain_exp = player.gain_exp
+        for exp_value in enemies.template_exp_value[enemies.template[killed]].tolist():
+            gain_exp(exp_value)
+        count = hit.size
+        self.message_log.add(f"Огненный шар поражает {count} врагов!", arcade.color.ORANGE)
+        return True
+    
+    def _use_teleport_scroll(self, item):
+        if not self.dungeon.rooms:
+            return False
+        room = random.choice(self.dungeon.rooms)
+        self.player.x, self.player.y = room.center
+        self._update_fov()
+        self.message_log.add("Телепортация!", arcade.color.CYAN)
+        return True
+    
+    def _equip_item(self, item, slot):
+        old = self.player.equip(slot, item)
+        if old:
+            self.player.inventory.append(old)
+        self.message_log.add(f"Экипировано: {item.name}", arcade.color.WHITE)
+        return True
+    
+    _USE_HANDLERS = {
+        ItemType.HEALTH_POTION: _use_health_potion,
+        ItemType.MANA_POTION: _use_mana_potion,
+        ItemType.SCROLL_FIREBALL: _use_fireball_scroll,
+        ItemType.SCROLL_TELEPORT: _use_teleport_scroll,
+        ItemType.SWORD: partial(_equip_item, slot='weapon'),
+        ItemType.SHIELD: partial(_equip_item, slot='shield'),
+        ItemType.ARMOR: partial(_equip_item, slot='armor'),
+        ItemType.RING: partial(_equip_item, slot='ring'),
+    }
     
     def cast_spell(self, spell_type):
+        player = self.player
         if spell_type == "heal":
             cost = 20
-            if self.player.mana >= cost:
-                heal = 15 + self.player.magic * 2
-                self.player.hp = min(self.player.hp + heal, self.player.max_hp)
-                self.player.mana -= cost
+            if player.mana >= cost:
+                heal = 15 + player.magic * 2
+                player.hp = min(player.hp + heal, player.max_hp)
+                player.mana -= cost
                 self.message_log.add(f"Исцеление: +{heal} ОЗ", arcade.color.GREEN)
             else:
                 self.message_log.add("Недостаточно маны!", arcade.color.RED)
         
         elif spell_type == "fireball":
             cost = 30
-            if self.player.mana >= cost:
-                damage = 20 + self.player.magic * 2
-                closest = None
-                min_dist = float('inf')
+            if player.mana >= cost:
+                damage = 20 + player.magic * 2
+                enemies = self.enemies
+                closest = enemies.closest_visible(player.x, player.y)
                 
-                for enemy in self.enemies:
-                    if enemy.is_alive() and self.dungeon.visible[enemy.x][enemy.y]:
-                        dist = abs(enemy.x - self.player.x) + abs(enemy.y - self.player.y)
-                        if dist < min_dist:
-                            min_dist = dist
-                            closest = enemy
-                
-                if closest:
-                    closest.hp -= damage
-                    self.player.mana -= cost
-                    self.message_log.add(f"Огненный шар: {damage} урона по {closest.name}!", arcade.color.ORANGE)
+                if closest >= 0:
+                    kind = enemies.kind(closest)
+                    name = kind.name
+                    enemies.hp[closest] -= damage
+                    player.mana -= cost
+                    self.message_log.add(f"Огненный шар: {damage} урона по {name}!", arcade.color.ORANGE)
                     
-                    if not closest.is_alive():
-                        self.player.gain_exp(closest.exp_value)
-                        self.message_log.add(f"{closest.name} повержен!", arcade.color.YELLOW)
+                    if enemies.hp[closest] <= 0:
+                        player.gain_exp(kind.exp_value)
+                        self.message_log.add(f"{name} повержен!", arcade.color.YELLOW)
                 else:
                     self.message_log.add("Нет целей!", arcade.color.GRAY)
             else:
                 self.message_log.add("Недостаточно маны!", arcade.color.RED)
     
-    def on_key_press(self, key, modifiers):
-        if self.state == GameState.MENU:
-            if key == arcade.key.ENTER:
-                self.state = GameState.CLASS_SELECT
-                self._update_music()
-            elif key == arcade.key.ESCAPE:
-                self.music.stop()
-                arcade.close_window()
-        
-        elif self.state == GameState.CLASS_SELECT:
-            classes = list(HeroClass)
-            if key in (arcade.key.UP, arcade.key.W):
-                self.selected_class_index = (self.selected_class_index - 1) % len(classes)
-            elif key in (arcade.key.DOWN, arcade.key.S):
-                self.selected_class_index = (self.selected_class_index + 1) % len(classes)
-            elif key == arcade.key.ENTER:
-                self.selected_hero_class = classes[self.selected_class_index]
-                self.tutorial_page = TutorialPage.CONTROLS
-                self.state = GameState.TUTORIAL
-            elif key == arcade.key.ESCAPE:
-                self.state = GameState.MENU
-                self._update_music()
-        
-        elif self.state == GameState.TUTORIAL:
-            if key in (arcade.key.RIGHT, arcade.key.D, arcade.key.ENTER):
-                current = self.tutorial_page.value
-                if current < len(TutorialPage) - 1:
-                    self.tutorial_page = TutorialPage(current + 1)
-                else:
-                    if self.selected_hero_class:
-                        self.start_new_game(self.selected_hero_class)
-            elif key in (arcade.key.LEFT, arcade.key.A):
-                current = self.tutorial_page.value
-                if current > 0:
-                    self.tutorial_page = TutorialPage(current - 1)
-            elif key == arcade.key.ESCAPE:
-                self.state = GameState.CLASS_SELECT
-            elif key == arcade.key.SPACE:
-                if self.selected_hero_class:
-                    self.start_new_game(self.selected_hero_class)
-        
-        elif self.state == GameState.PLAYING:
-            if key in (arcade.key.UP, arcade.key.W):
-                self.move_player(0, 1)
-            elif key in (arcade.key.DOWN, arcade.key.S):
-                self.move_player(0, -1)
-            elif key in (arcade.key.LEFT, arcade.key.A):
-                self.move_player(-1, 0)
-            elif key in (arcade.key.RIGHT, arcade.key.D):
-                self.move_player(1, 0)
-            elif key == arcade.key.ENTER:
-                if self.dungeon.tiles[self.player.x][self.player.y] == TileType.STAIRS:
-                    self.next_level()
-            elif key == arcade.key.I:
-                self.state = GameState.INVENTORY
-                self.selected_inventory_index = 0
-            elif key == arcade.key.SPACE:
-                self._enemy_turn()
-                self.turn_count += 1
-            elif key == arcade.key.KEY_1:
-                self.cast_spell("heal")
-            elif key == arcade.key.KEY_2:
-                self.cast_spell("fireball")
-            elif key == arcade.key.ESCAPE:
-                self.state = GameState.PAUSED
-        
-        elif self.state == GameState.INVENTORY:
-            if key in (arcade.key.UP, arcade.key.W):
-                self.selected_inventory_index = max(0, self.selected_inventory_index - 1)
-            elif key in (arcade.key.DOWN, arcade.key.S):
-                self.selected_inventory_index = min(len(self.player.inventory) - 1, self.selected_inventory_index + 1)
-            elif key == arcade.key.ENTER:
-                self.use_item(self.selected_inventory_index)
-                self.selected_inventory_index = min(self.selected_inventory_index, len(self.player.inventory) - 1)
-            elif key in (arcade.key.ESCAPE, arcade.key.I):
-                self.state = GameState.PLAYING
+    def _build_keymap(self):
+        key = arcade.key
+        keymap = {
+            GameState.MENU: {
+                key.ENTER: partial(self._set_state, GameState.CLASS_SELECT),
+                key.ESCAPE: self._quit,
+            },
+            GameState.CLASS_SELECT: {
+                key.ENTER: self._choose_class,
+                key.ESCAPE: partial(self._set_state, GameState.MENU),
+            },
+            GameState.TUTORIAL: {
+                key.ESCAPE: partial(self._set_state, GameState.CLASS_SELECT),
+                key.SPACE: self._begin_adventure,
+            },
+            GameState.PLAYING: {
+                key.ENTER: self._descend,
+                key.I: self._open_inventory,
+                key.SPACE: self._wait_turn,
+                key.KEY_1: partial(self.cast_spell, "heal"),
+                key.KEY_2: partial(self.cast_spell, "fireball"),
+                key.ESCAPE: partial(self._set_state, GameState.PAUSED),
+            },
+            GameState.INVENTORY: {
+                key.ENTER: self._use_selected_item,
+                key.ESCAPE: partial(self._set_state, GameState.PLAYING),
+                key.I: partial(self._set_state, GameState.PLAYING),
+            },
+            GameState.PAUSED: {
+                key.ESCAPE: partial(self._set_state, GameState.PLAYING),
+                key.Q: partial(self._set_state, GameState.MENU),
+            },
+            GameState.GAME_OVER: {
+                key.ENTER: partial(self._set_state, GameState.MENU),
+            },
+            GameState.VICTORY: {
+                key.ENTER: partial(self._set_state, GameState.MENU),
+            },
+        }
         
-        elif self.state == GameState.PAUSED:
-            if key == arcade.key.ESCAPE:
-                self.state = GameState.PLAYING
-            elif key == arcade.key.Q:
-                self.state = GameState.MENU
-                self._update_music()
+        for k in (key.UP, key.W):
+            keymap[GameState.CLASS_SELECT][k] = partial(self._cycle_class, -1)
+            keymap[GameState.PLAYING][k] = partial(self.move_player, 0, 1)
+            keymap[GameState.INVENTORY][k] = partial(self._move_inventory_cursor, -1)
+        for k in (key.DOWN, key.S):
+            keymap[GameState.CLASS_SELECT][k] = partial(self._cycle_class, 1)
+            keymap[GameState.PLAYING][k] = partial(self.move_player, 0, -1)
+            keymap[GameState.INVENTORY][k] = partial(self._move_inventory_cursor, 1)
+        for k in (key.LEFT, key.A):
+            keymap[GameState.TUTORIAL][k] = partial(self._turn_tutorial_page, -1)
+            keymap[GameState.PLAYING][k] = partial(self.move_player, -1, 0)
+        for k in (key.RIGHT, key.D):
+            keymap[GameState.TUTORIAL][k] = partial(self._turn_tutorial_page, 1)
+            keymap[GameState.PLAYING][k] = partial(self.move_player, 1, 0)
+        keymap[GameState.TUTORIAL][key.ENTER] = partial(self._turn_tutorial_page, 1)
+        
+        return keymap
+    
+    def _set_state(self, state):
+        self.state = state
+        self._update_music()
+    
+    def _quit(self):
+        self.music.stop()
+        arcade.close_window()
+    
+    def _cycle_class(self, step):
+        self.selected_class_index = (self.selected_class_index + step) % len(HERO_CLASSES)
+    
+    def _choose_class(self):
+        self.selected_hero_class = HERO_CLASSES[self.selected_class_index]
+        self.tutorial_page = TutorialPage.CONTROLS
+        self.state = GameState.TUTORIAL
+    
+    def _turn_tutorial_page(self, step):
+        page = self.tutorial_page.value + step
+        if 0 <= page < TUTORIAL_PAGE_COUNT:
+            self.tutorial_page = TutorialPage(page)
+        elif step > 0:
+            self._begin_adventure()
+    
+    def _begin_adventure(self):
+        if self.selected_hero_class:
+            self.start_new_game(self.selected_hero_class)
+    
+    def _descend(self):
+        if self.dungeon.tiles[self.player.x, self.player.y] == STAIRS:
+            self.next_level()
+    
+    def _open_inventory(self):
+        self.state = GameState.INVENTORY
+        self.selected_inventory_index = 0
+    
+    def _wait_turn(self):
+        self._enemy_turn()
+        self.turn_count += 1
+    
+    def _move_inventory_cursor(self, step):
+        self.selected_inventory_index = max(0, min(len(self.player.inventory) - 1, self.selected_inventory_index + step))
+    
+    def _use_selected_item(self):
+        self.use_item(self.selected_inventory_index)
+        self.selected_inventory_index = max(0, min(self.selected_inventory_index, len(self.player.inventory) - 1))
+    
+    def on_key_press(self, key, modifiers):
+        action = self.keymap.get(self.state, {}).get(key)
+        if action:
+            action()
         
-        elif self.state in (GameState.GAME_OVER, GameState.VICTORY):
-            if key == arcade.key.ENTER:
-                self.state = GameState.MENU
-                self._update_music()
+        if self.player and self.dungeon:
+            self._sync_sprites()
     
     def on_update(self, delta_time):
-        for effect in self.particle_effects[:]:
-            effect['life'] -= 1
-            effect['y'] += 1
-            if effect['life'] <= 0:
-                self.particle_effects.remove(effect)
-        
-        if self.player:
-            target_x = self.player.x * TILE_SIZE - SCREEN_WIDTH // 2
-            target_y = self.player.y * TILE_SIZE - SCREEN_HEIGHT // 2
-            self.camera_x += (target_x - self.camera_x) * 0.1
-            self.camera_y += (target_y - self.camera_y) * 0.1
+        self.particle_effects.update()
+        
+        static = self.state in STATIC_STATES
+        if static != self.throttled:
+            self.throttled = static
+            self.set_draw_rate(STATIC_DRAW_RATE if static else DRAW_RATE)
+        
+        player = self.player
+        if player:
+            camera_x, camera_y = self.camera_x, self.camera_y
+            self.camera_x = camera_x + (player.x * TILE_SIZE - SCREEN_CENTER_X - camera_x) * CAMERA_LERP
+            self.camera_y = camera_y + (player.y * TILE_SIZE - SCREEN_CENTER_Y - camera_y) * CAMERA_LERP
     
     def on_draw(self):
         self.clear()
         
+        if self.state not in STATIC_STATES:
+            self.cached_screen_state = None
+        
         if self.state == GameState.MENU:
             self._draw_menu()
         elif self.state == GameState.CLASS_SELECT:
@@ -1099,116 +1547,240 @@ class DungeonRogue(arcade.Window):
             self._draw_game()
             self._draw_pause()
         elif self.state == GameState.GAME_OVER:
-            self._draw_game_over()
+            self._draw_cached_screen(self._draw_game_over)
         elif self.state == GameState.VICTORY:
-            self._draw_victory()
+            self._draw_cached_screen(self._draw_victory)
+    
+    def _draw_cached_screen(self, draw):
+        if self.cached_screen_state != self.state:
+            with self.screen_cache.activate() as framebuffer:
+                framebuffer.clear(color=self.background_color)
+                draw()
+            self.cached_screen_state = self.state
+        
+        self.screen_cache.color_attachments[0].use(0)
+        with self.ctx.enabled_only():
+            self.screen_quad.render(self.ctx.utility_textured_quad_program)
+    
+    def _build_static_texts(self):
+        cx = SCREEN_CENTER_X
+        cy = SCREEN_CENTER_Y
+        
+        self.menu_batch = pyglet.graphics.Batch()
+        self.menu_texts = [
+            arcade.Text("Crypt Knight", cx, cy + 100, arcade.color.GOLD, 56, anchor_x="center", bold=True, batch=self.menu_batch),
+            arcade.Text("Adventure", cx, cy + 40, arcade.color.LIGHT_GRAY, 24, anchor_x="center", batch=self.menu_batch),
+            arcade.Text("Нажмите ENTER чтобы начать", cx, cy - 50, arcade.color.WHITE, 28, anchor_x="center", batch=self.menu_batch),
+            arcade.Text("Нажмите ESC для выхода", cx, cy - 100, arcade.color.GRAY, 20, anchor_x="center", batch=self.menu_batch),
+        ]
+        
+        self.class_select_batch = pyglet.graphics.Batch()
+        self.class_select_texts = [
+            arcade.Text("Выберите класс героя", cx, SCREEN_HEIGHT - 80, arcade.color.GOLD, 36, anchor_x="center", batch=self.class_select_batch),
+            arcade.Text("Вверх/Вниз - выбор   ENTER - подтвердить   ESC - назад", cx, 50, arcade.color.GRAY, 16, anchor_x="center", batch=self.class_select_batch),
+        ]
+        self.class_texts = []
+        for i, hero_class in enumerate(HERO_CLASSES):
+            center_y = SCREEN_HEIGHT - 180 - i * 120
+            stats = f"ОЗ: {hero_class.base_hp}  Мана: {hero_class.base_mana}  АТК: {hero_class.base_attack}  ЗАЩ: {hero_class.base_defense}  МАГ: {hero_class.base_magic}"
+            self.class_texts.append((
+                arcade.Text(hero_class.title, cx, center_y + 15, arcade.color.WHITE, 28, anchor_x="center", anchor_y="center"),
+                arcade.Text(stats, cx, center_y - 20, arcade.color.LIGHT_GRAY, 14, anchor_x="center", anchor_y="center"),
+            ))
+        
+        left = cx - 400
+        bottom = cy - 300
+        page_titles = {TutorialPage.CONTROLS: "УПРАВЛЕНИЕ", TutorialPage.ENEMIES: "ВРАГИ", TutorialPage.ITEMS: "ПРЕДМЕТЫ", TutorialPage.LORE: "ЛЕГЕНДА"}
+        self.tutorial_headers = {
+            page: (
+                arcade.Text(title, cx, bottom + 550, arcade.color.GOLD, 32, anchor_x="center", bold=True),
+                arcade.Text(f"Страница {page.value + 1}/{TUTORIAL_PAGE_COUNT}", cx, bottom + 515, arcade.color.LIGHT_GRAY, 16, anchor_x="center"),
+            )
+            for page, title in page_titles.items()
+        }
+        content_y = bottom + 470
+        controls = []
+        for i, (key, action) in enumerate(TUTORIAL_CONTROLS):
+            y = content_y - i * 40
+            controls.append(arcade.Text(key, left + 120, y, arcade.color.YELLOW, 16, anchor_x="center"))
+            controls.append(arcade.Text("-", left + 220, y, arcade.color.WHITE, 16))
+            controls.append(arcade.Text(action, left + 240, y, arcade.color.WHITE, 16))
+        
+        enemies, enemy_icons = [], []
+        for i, (name, color, desc, tex_name) in enumerate(TUTORIAL_ENEMIES):
+            y = content_y - i * 55
+            enemy_icons.append((tex_name, left + 60, y, 40))
+            enemies.append(arcade.Text(name, left + 120, y + 8, color, 18, bold=True))
+            enemies.append(arcade.Text(desc, left + 120, y - 12, arcade.color.LIGHT_GRAY, 13))
+        
+        items, item_icons = [], []
+        for i, (name, color, desc, tex_name) in enumerate(TUTORIAL_ITEMS):
+            y = content_y - i * 52
+            item_icons.append((tex_name, left + 60, y, 36))
+            items.append(arcade.Text(name, left + 120, y + 8, color, 16, bold=True))
+            items.append(arcade.Text(desc, left + 120, y - 12, arcade.color.LIGHT_GRAY, 12))
+        
+        lore = []
+        for i, line in enumerate(TUTORIAL_LORE):
+            color = arcade.color.GOLD if i == 0 or i == len(TUTORIAL_LORE) - 1 else arcade.color.LIGHT_GRAY
+            lore.append(arcade.Text(line, cx, content_y - i * 26, color, 15, anchor_x="center"))
+        
+        self.tutorial_pages = {
+            TutorialPage.CONTROLS: (controls, []),
+            TutorialPage.ENEMIES: (enemies, enemy_icons),
+            TutorialPage.ITEMS: (items, item_icons),
+            TutorialPage.LORE: (lore, []),
+        }
+        
+        nav_y = bottom + 30
+        self.tutorial_back_text = arcade.Text("<< A/Влево: Назад", left + 100, nav_y, arcade.color.GRAY, 14, anchor_x="center")
+        self.tutorial_next_text = arcade.Text("D/Вправо/Enter: Далее >>", left + 680, nav_y, arcade.color.GRAY, 14, anchor_x="center")
+        self.tutorial_start_text = arcade.Text("ENTER: Начать приключение!", left + 660, nav_y, arcade.color.GOLD, 16, anchor_x="center", bold=True)
+        self.tutorial_skip_text = arcade.Text("ПРОБЕЛ: Пропустить обучение", cx, nav_y, arcade.color.DARK_GRAY, 12, anchor_x="center")
+        
+        left = cx - 250
+        bottom = cy - 250
+        self.inventory_batch = pyglet.graphics.Batch()
+        self.inventory_texts = [
+            arcade.Text("ИНВЕНТАРЬ", cx, bottom + 460, arcade.color.GOLD, 24, anchor_x="center", batch=self.inventory_batch),
+            arcade.Text("Снаряжение:", left + 30, cy + 160, arcade.color.WHITE, 14, batch=self.inventory_batch),
+            arcade.Text("Предметы:", left + 30, cy + 30, arcade.color.WHITE, 14, batch=self.inventory_batch),
+            arcade.Text("Вверх/Вниз - выбор   ENTER - использовать   ESC - закрыть", cx, bottom + 20, arcade.color.GRAY, 12, anchor_x="center", batch=self.inventory_batch),
+        ]
+        self.inventory_empty_text = arcade.Text("Пусто", cx, cy - 20, arcade.color.GRAY, 16, anchor_x="center")
+        
+        self.pause_batch = pyglet.graphics.Batch()
+        self.pause_texts = [
+            arcade.Text("ПАУЗА", cx, cy + 50, arcade.color.WHITE, 36, anchor_x="center", batch=self.pause_batch),
+            arcade.Text("ESC - продолжить", cx, cy, arcade.color.GRAY, 18, anchor_x="center", batch=self.pause_batch),
+            arcade.Text("Q - выйти в меню", cx, cy - 30, arcade.color.GRAY, 18, anchor_x="center", batch=self.pause_batch),
+        ]
+        self.game_over_batch = pyglet.graphics.Batch()
+        self.game_over_texts = [
+            arcade.Text("ВЫ ПОГИБЛИ", cx, cy + 100, arcade.color.RED, 48, anchor_x="center", batch=self.game_over_batch),
+            arcade.Text("Нажмите ENTER для перезапуска", cx, 150, arcade.color.GOLD, 20, anchor_x="center", batch=self.game_over_batch),
+        ]
+        self.hud_batch = pyglet.graphics.Batch()
+        self.hud_turn_text = arcade.Text("", 420, SCREEN_HEIGHT - 78, arcade.color.GRAY, 12)
+        self.hud_texts = [
+            arcade.Text("", 20, SCREEN_HEIGHT - 30, arcade.color.GOLD, 18, bold=True, batch=self.hud_batch),
+            arcade.Text("", 120, SCREEN_HEIGHT - 55, arcade.color.WHITE, 10, anchor_x="center", anchor_y="center", batch=self.hud_batch),
+            arcade.Text("", 120, SCREEN_HEIGHT - 78, arcade.color.WHITE, 10, anchor_x="center", anchor_y="center", batch=self.hud_batch),
+            arcade.Text("", 315, SCREEN_HEIGHT - 55, arcade.color.WHITE, 10, anchor_x="center", anchor_y="center", batch=self.hud_batch),
+            arcade.Text("", 240, SCREEN_HEIGHT - 78, arcade.color.WHITE, 14, batch=self.hud_batch),
+            arcade.Text("", 420, SCREEN_HEIGHT - 35, arcade.color.GOLD, 16, batch=self.hud_batch),
+            arcade.Text("", 420, SCREEN_HEIGHT - 60, arcade.color.GRAY, 14, batch=self.hud_batch),
+            self.hud_turn_text,
+        ]
+        self.hud_hints = [
+            arcade.Text("1:Лечение 2:Огонь I:Инвентарь", SCREEN_WIDTH - 220, SCREEN_HEIGHT - 35, arcade.color.LIGHT_GRAY, 12, batch=self.hud_batch),
+            arcade.Text("WASD:Движение ПРОБЕЛ:Ждать", SCREEN_WIDTH - 210, SCREEN_HEIGHT - 55, arcade.color.LIGHT_GRAY, 12, batch=self.hud_batch),
+        ]
+        self.hud_values = [None] * len(self.hud_texts)
+        
+        self.game_over_stat_texts = [arcade.Text("", cx, cy - i * 30, arcade.color.WHITE, 20, anchor_x="center") for i in range(5)]
+        self.victory_batch = pyglet.graphics.Batch()
+        self.victory_texts = [
+            arcade.Text("ПОБЕДА!", cx, cy + 100, arcade.color.GOLD, 48, anchor_x="center", batch=self.victory_batch),
+            arcade.Text("Вы покорили подземелье!", cx, cy + 40, arcade.color.WHITE, 24, anchor_x="center", batch=self.victory_batch),
+            arcade.Text("Нажмите ENTER для возврата в меню", cx, 150, arcade.color.GOLD, 20, anchor_x="center", batch=self.victory_batch),
+        ]
+        self.victory_stat_texts = [arcade.Text("", cx, cy - 30 - i * 30, arcade.color.WHITE, 18, anchor_x="center") for i in range(4)]
+    
+    def _build_static_shapes(self):
+        cx = SCREEN_CENTER_X
+        cy = SCREEN_CENTER_Y
+        shapes = arcade.shape_list
+        
+        def batch(*elements):
+            shape_list = shapes.ShapeElementList()
+            for element in elements:
+                shape_list.append(element)
+            return shape_list
+        
+        self.ui_shapes = batch(
+            shapes.create_rectangle_filled(cx, SCREEN_HEIGHT - 40, SCREEN_WIDTH, 80, (20, 20, 30, 230)),
+            shapes.create_rectangle_filled(cx, 60, SCREEN_WIDTH, 120, (20, 20, 30, 200)),
+        )
+        self.inventory_shapes = batch(
+            shapes.create_rectangle_filled(cx, cy, SCREEN_WIDTH, SCREEN_HEIGHT, (0, 0, 0, 180)),
+            shapes.create_rectangle_filled(cx, cy, 500, 500, (30, 30, 45, 255)),
+            shapes.create_rectangle_outline(cx, cy, 500, 500, arcade.color.GOLD, 3),
+        )
+        self.inventory_highlight = batch(shapes.create_rectangle_filled(cx, cy + 5, 460, 20, arcade.color.DARK_SLATE_GRAY))
+        self.pause_shapes = batch(shapes.create_rectangle_filled(cx, cy, 400, 200, (30, 30, 50, 240)))
     
     def _draw_menu(self):
         if self.textures.has('menu_bg'):
-            draw_texture_at(self.textures.get('menu_bg'), SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, SCREEN_WIDTH, SCREEN_HEIGHT)
+            draw_texture_at(self.textures.get('menu_bg'), SCREEN_CENTER_X, SCREEN_CENTER_Y, SCREEN_WIDTH, SCREEN_HEIGHT)
             arcade.draw_lbwh_rectangle_filled(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT, (0, 0, 0, 150))
         else:
-            arcade.draw_lbwh_rectangle_filled(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT, arcade.color.DARK_SLATE_GRAY)
+            arcade.draw_lbwh_rectangle_filled(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT, MENU_FALLBACK_COLOR)
         
-        arcade.draw_text("Crypt Knight", SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100, arcade.color.GOLD, 56, anchor_x="center", bold=True)
-        arcade.draw_text("Adventure", SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 40, arcade.color.LIGHT_GRAY, 24, anchor_x="center")
-        arcade.draw_text("Нажмите ENTER чтобы начать", SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50, arcade.color.WHITE, 28, anchor_x="center")
-        arcade.draw_text("Нажмите ESC для выхода", SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100, arcade.color.GRAY, 20, anchor_x="center")
+        self.menu_batch.draw()
     
     def _draw_class_select(self):
         if self.textures.has('menu_bg'):
-            draw_texture_at(self.textures.get('menu_bg'), SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, SCREEN_WIDTH, SCREEN_HEIGHT)
+            draw_texture_at(self.textures.get('menu_bg'), SCREEN_CENTER_X, SCREEN_CENTER_Y, SCREEN_WIDTH, SCREEN_HEIGHT)
             arcade.draw_lbwh_rectangle_filled(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT, (0, 0, 0, 180))
         else:
-            arcade.draw_lbwh_rectangle_filled(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT, arcade.color.DARK_SLATE_GRAY)
+            arcade.draw_lbwh_rectangle_filled(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT, MENU_FALLBACK_COLOR)
         
-        arcade.draw_text("Выберите класс героя", SCREEN_WIDTH // 2, SCREEN_HEIGHT - 80, arcade.color.GOLD, 36, anchor_x="center")
+        self.class_select_batch.draw()
         
-        classes = list(HeroClass)
         start_y = SCREEN_HEIGHT - 180
         item_height = 100
         item_spacing = 20
+        gold = arcade.color.GOLD
+        white = arcade.color.WHITE
         
-        for i, hero_class in enumerate(classes):
+        for i, (title, stats) in enumerate(self.class_texts):
             center_y = start_y - i * (item_height + item_spacing)
             
             if i == self.selected_class_index:
-                arcade.draw_lbwh_rectangle_filled(SCREEN_WIDTH // 2 - 250, center_y - item_height // 2, 500, item_height, (60, 60, 80, 200))
-                arcade.draw_lbwh_rectangle_outline(SCREEN_WIDTH // 2 - 250, center_y - item_height // 2, 500, item_height, arcade.color.GOLD, 3)
+                arcade.draw_lbwh_rectangle_filled(SCREEN_CENTER_X - 250, center_y - item_height // 2, 500, item_height, (60, 60, 80, 200))
+                arcade.draw_lbwh_rectangle_outline(SCREEN_CENTER_X - 250, center_y - item_height // 2, 500, item_height, gold, 3)
             else:
-                arcade.draw_lbwh_rectangle_filled(SCREEN_WIDTH // 2 - 250, center_y - item_height // 2, 500, item_height, (40, 40, 60, 150))
+                arcade.draw_lbwh_rectangle_filled(SCREEN_CENTER_X - 250, center_y - item_height // 2, 500, item_height, (40, 40, 60, 150))
             
-            color = arcade.color.GOLD if i == self.selected_class_index else arcade.color.WHITE
-            arcade.draw_text(hero_class.title, SCREEN_WIDTH // 2, center_y + 15, color, 28, anchor_x="center", anchor_y="center")
-            
-            stats = f"ОЗ: {hero_class.base_hp}  Мана: {hero_class.base_mana}  АТК: {hero_class.base_attack}  ЗАЩ: {hero_class.base_defense}  МАГ: {hero_class.base_magic}"
-            arcade.draw_text(stats, SCREEN_WIDTH // 2, center_y - 20, arcade.color.LIGHT_GRAY, 14, anchor_x="center", anchor_y="center")
-        
-        arcade.draw_text("Вверх/Вниз - выбор   ENTER - подтвердить   ESC - назад", SCREEN_WIDTH // 2, 50, arcade.color.GRAY, 16, anchor_x="center")
+            color = gold if i == self.selected_class_index else white
+            if title.color != color:
+                title.color = color
+            title.draw()
+            stats.draw()
     
     def _draw_tutorial(self):
         if self.textures.has('menu_bg'):
-            draw_texture_at(self.textures.get('menu_bg'), SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, SCREEN_WIDTH, SCREEN_HEIGHT)
+            draw_texture_at(self.textures.get('menu_bg'), SCREEN_CENTER_X, SCREEN_CENTER_Y, SCREEN_WIDTH, SCREEN_HEIGHT)
             arcade.draw_lbwh_rectangle_filled(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT, (0, 0, 0, 200))
         else:
             arcade.draw_lbwh_rectangle_filled(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT, (20, 20, 35))
         
         panel_width = 800
         panel_height = 600
-        left = SCREEN_WIDTH // 2 - panel_width // 2
-        bottom = SCREEN_HEIGHT // 2 - panel_height // 2
+        left = SCREEN_CENTER_X - panel_width // 2
+        bottom = SCREEN_CENTER_Y - panel_height // 2
         
         arcade.draw_lbwh_rectangle_filled(left, bottom, panel_width, panel_height, (30, 30, 50, 240))
-        arcade.draw_lbwh_rectangle_outline(left, bottom, panel_width, panel_height, arcade.color.GOLD, 3)
+        arcade.draw_lbwh_rectangle_outline(left, bottom, panel_width, panel_height, PANEL_BORDER_COLOR, 3)
         
-        page_titles = {TutorialPage.CONTROLS: "УПРАВЛЕНИЕ", TutorialPage.ENEMIES: "ВРАГИ", TutorialPage.ITEMS: "ПРЕДМЕТЫ", TutorialPage.LORE: "ЛЕГЕНДА"}
+        for text in self.tutorial_headers[self.tutorial_page]:
+            text.draw()
         
-        arcade.draw_text(page_titles[self.tutorial_page], SCREEN_WIDTH // 2, bottom + panel_height - 50, arcade.color.GOLD, 32, anchor_x="center", bold=True)
-        arcade.draw_text(f"Страница {self.tutorial_page.value + 1}/{len(TutorialPage)}", SCREEN_WIDTH // 2, bottom + panel_height - 85, arcade.color.LIGHT_GRAY, 16, anchor_x="center")
-        
-        content_y = bottom + panel_height - 130
-        
-        if self.tutorial_page == TutorialPage.CONTROLS:
-            controls = [("W / Стрелка вверх", "Движение вверх"), ("S / Стрелка вниз", "Движение вниз"), ("A / Стрелка влево", "Движение влево"), ("D / Стрелка вправо", "Движение вправо"), ("ПРОБЕЛ", "Ждать (пропустить ход)"), ("ENTER", "Спуститься по лестнице"), ("I", "Открыть инвентарь"), ("1", "Заклинание исцеления (20 маны)"), ("2", "Огненный шар (30 маны)"), ("ESC", "Пауза")]
-            for i, (key, action) in enumerate(controls):
-                y = content_y - i * 40
-                arcade.draw_text(key, left + 120, y, arcade.color.YELLOW, 16, anchor_x="center")
-                arcade.draw_text("-", left + 220, y, arcade.color.WHITE, 16)
-                arcade.draw_text(action, left + 240, y, arcade.color.WHITE, 16)
-        
-        elif self.tutorial_page == TutorialPage.ENEMIES:
-            enemies_info = [("Крыса", arcade.color.BROWN, "Слабая, но быстрая.", 'rat'), ("Гоблин", arcade.color.GREEN, "Обычное существо подземелья.", 'goblin'), ("Орк", arcade.color.DARK_GREEN, "Сильный воин.", 'orc'), ("Скелет", arcade.color.WHITE, "Нежить со средними характеристиками.", 'skeleton'), ("Зомби", arcade.color.GRAY, "Медленный, но живучий.", 'zombie'), ("Тролль", arcade.color.DARK_OLIVE_GREEN, "Огромный зверь. Очень опасен!", 'troll'), ("Тёмный маг", arcade.color.PURPLE, "Мощные магические атаки.", 'mage'), ("Демон", arcade.color.DARK_RED, "Элитный враг.", 'demon')]
-            for i, (name, color, desc, tex_name) in enumerate(enemies_info):
-                y = content_y - i * 55
-                if self.textures.has(tex_name):
-                    draw_texture_at(self.textures.get(tex_name), left + 60, y, 40, 40)
-                arcade.draw_text(name, left + 120, y + 8, color, 18, bold=True)
-                arcade.draw_text(desc, left + 120, y - 12, arcade.color.LIGHT_GRAY, 13)
-        
-        elif self.tutorial_page == TutorialPage.ITEMS:
-            items_info = [("Зелье здоровья", arcade.color.RED, "Восстанавливает ОЗ.", 'health_potion'), ("Зелье маны", arcade.color.BLUE, "Восстанавливает ману.", 'mana_potion'), ("Золото", arcade.color.GOLD, "Валюта.", 'gold'), ("Меч", arcade.color.SILVER, "Увеличивает урон.", 'sword'), ("Щит", arcade.color.LIGHT_GRAY, "Увеличивает защиту.", 'shield'), ("Броня", arcade.color.BRONZE, "Добавляет защиту.", 'armor'), ("Кольцо", arcade.color.PURPLE, "Магическое кольцо.", 'ring'), ("Свиток огня", arcade.color.ORANGE, "Урон всем видимым врагам!", 'scroll'), ("Свиток телепорта", arcade.color.CYAN, "Перемещает в случайную комнату.", 'scroll')]
-            for i, (name, color, desc, tex_name) in enumerate(items_info):
-                y = content_y - i * 52
-                if self.textures.has(tex_name):
-                    draw_texture_at(self.textures.get(tex_name), left + 60, y, 36, 36)
-                arcade.draw_text(name, left + 120, y + 8, color, 16, bold=True)
-                arcade.draw_text(desc, left + 120, y - 12, arcade.color.LIGHT_GRAY, 12)
-        
-        elif self.tutorial_page == TutorialPage.LORE:
-            lore_text = ["В древнем королевстве Вальдория существовало подземелье,", "настолько глубокое и опасное, что никто из вошедших", "не возвращался обратно.", "", "Бездонные Глубины, как его стали называть, хранили", "несметные богатства и могущественные артефакты", "забытой эпохи. Но также там обитали невыразимые ужасы -", "существа тьмы, питающиеся душами храбрецов.", "", "Вы - один из немногих искателей приключений, достаточно", "смелых, чтобы бросить вызов глубинам. Вооружённый лишь", "своими навыками и отвагой, вы должны пройти через", "10 этажей возрастающей опасности.", "", "На дне ждёт источник всего зла этих земель.", "Победите его - и станете легендой.", "", "Да пребудет с вами удача. Ваше путешествие начинается..."]
-            for i, line in enumerate(lore_text):
-                y = content_y - i * 26
-                color = arcade.color.GOLD if i == 0 or i == len(lore_text) - 1 else arcade.color.LIGHT_GRAY
-                arcade.draw_text(line, SCREEN_WIDTH // 2, y, color, 15, anchor_x="center")
+        texts, icons = self.tutorial_pages[self.tutorial_page]
+        for tex_name, x, y, size in icons:
+            if self.textures.has(tex_name):
+                draw_texture_at(self.textures.get(tex_name), x, y, size, size)
+        for text in texts:
+            text.draw()
         
-        nav_y = bottom + 30
         if self.tutorial_page.value > 0:
-            arcade.draw_text("<< A/Влево: Назад", left + 100, nav_y, arcade.color.GRAY, 14, anchor_x="center")
-        if self.tutorial_page.value < len(TutorialPage) - 1:
-            arcade.draw_text("D/Вправо/Enter: Далее >>", left + panel_width - 120, nav_y, arcade.color.GRAY, 14, anchor_x="center")
+            self.tutorial_back_text.draw()
+        if self.tutorial_page.value < TUTORIAL_PAGE_COUNT - 1:
+            self.tutorial_next_text.draw()
         else:
-            arcade.draw_text("ENTER: Начать приключение!", left + panel_width - 140, nav_y, arcade.color.GOLD, 16, anchor_x="center", bold=True)
-        arcade.draw_text("ПРОБЕЛ: Пропустить обучение", SCREEN_WIDTH // 2, nav_y, arcade.color.DARK_GRAY, 12, anchor_x="center")
+            self.tutorial_start_text.draw()
+        self.tutorial_skip_text.draw()
     
     def _draw_game(self):
         if not self.dungeon:
@@ -1217,187 +1789,132 @@ class DungeonRogue(arcade.Window):
         offset_x = -self.camera_x
         offset_y = -self.camera_y
         
-        WALL_COLOR = (50, 50, 60)
-        WALL_DARK_COLOR = (25, 25, 35)
-        FLOOR_COLOR = (35, 35, 45)
-        FLOOR_DARK_COLOR = (20, 20, 28)
-        STAIRS_COLOR = (25, 60, 25)
-        
-        for x in range(self.dungeon.width):
-            for y in range(self.dungeon.height):
-                screen_x = x * TILE_SIZE + offset_x + TILE_SIZE // 2
-                screen_y = y * TILE_SIZE + offset_y + TILE_SIZE // 2
-                
-                if screen_x < -TILE_SIZE or screen_x > SCREEN_WIDTH + TILE_SIZE:
-                    continue
-                if screen_y < -TILE_SIZE or screen_y > SCREEN_HEIGHT + TILE_SIZE:
-                    continue
-                
-                tile = self.dungeon.tiles[x][y]
-                
-                if self.dungeon.visible[x][y]:
-                    if tile == TileType.WALL:
-                        if self.textures.has('wall'):
-                            draw_texture_at(self.textures.get('wall'), screen_x, screen_y, TILE_SIZE, TILE_SIZE)
-                        else:
-                            arcade.draw_lbwh_rectangle_filled(screen_x - TILE_SIZE//2, screen_y - TILE_SIZE//2, TILE_SIZE, TILE_SIZE, WALL_COLOR)
-                    elif tile == TileType.FLOOR:
-                        if self.textures.has('floor'):
-                            draw_texture_at(self.textures.get('floor'), screen_x, screen_y, TILE_SIZE, TILE_SIZE)
-                        else:
-                            arcade.draw_lbwh_rectangle_filled(screen_x - TILE_SIZE//2, screen_y - TILE_SIZE//2, TILE_SIZE, TILE_SIZE, FLOOR_COLOR)
-                    elif tile == TileType.STAIRS:
-                        if self.textures.has('stairs'):
-                            draw_texture_at(self.textures.get('stairs'), screen_x, screen_y, TILE_SIZE, TILE_SIZE)
-                        else:
-                            arcade.draw_lbwh_rectangle_filled(screen_x - TILE_SIZE//2, screen_y - TILE_SIZE//2, TILE_SIZE, TILE_SIZE, STAIRS_COLOR)
-                elif self.dungeon.explored[x][y]:
-                    if tile == TileType.WALL:
-                        arcade.draw_lbwh_rectangle_filled(screen_x - TILE_SIZE//2, screen_y - TILE_SIZE//2, TILE_SIZE, TILE_SIZE, WALL_DARK_COLOR)
-                    elif tile in [TileType.FLOOR, TileType.STAIRS]:
-                        arcade.draw_lbwh_rectangle_filled(screen_x - TILE_SIZE//2, screen_y - TILE_SIZE//2, TILE_SIZE, TILE_SIZE, FLOOR_DARK_COLOR)
-        
-        for item in self.items:
-            if self.dungeon.visible[item.x][item.y]:
-                screen_x = item.x * TILE_SIZE + offset_x + TILE_SIZE // 2
-                screen_y = item.y * TILE_SIZE + offset_y + TILE_SIZE // 2
-                if item.sprite and item.sprite.texture:
-                    draw_texture_at(item.sprite.texture, screen_x, screen_y, TILE_SIZE * 0.7, TILE_SIZE * 0.7)
-        
-        for enemy in self.enemies:
-            if enemy.is_alive() and self.dungeon.visible[enemy.x][enemy.y]:
-                screen_x = enemy.x * TILE_SIZE + offset_x + TILE_SIZE // 2
-                screen_y = enemy.y * TILE_SIZE + offset_y + TILE_SIZE // 2
-                size = TILE_SIZE * 1.2 if enemy.is_boss else TILE_SIZE
-                if enemy.sprite and enemy.sprite.texture:
-                    draw_texture_at(enemy.sprite.texture, screen_x, screen_y, size, size)
-                hp_width = TILE_SIZE - 4
-                hp_height = 4
-                hp_ratio = enemy.hp / enemy.max_hp
-                bar_y = screen_y + size / 2 + 4
-                arcade.draw_lbwh_rectangle_filled(screen_x - hp_width//2, bar_y - hp_height//2, hp_width, hp_height, arcade.color.DARK_RED)
-                if hp_ratio > 0:
-                    arcade.draw_lbwh_rectangle_filled(screen_x - hp_width//2, bar_y - hp_height//2, int(hp_width * hp_ratio), hp_height, arcade.color.RED)
-        
-        if self.player:
-            screen_x = self.player.x * TILE_SIZE + offset_x + TILE_SIZE // 2
-            screen_y = self.player.y * TILE_SIZE + offset_y + TILE_SIZE // 2
-            if self.player.sprite and self.player.sprite.texture:
-                draw_texture_at(self.player.sprite.texture, screen_x, screen_y, TILE_SIZE, TILE_SIZE)
-        
-        for effect in self.particle_effects:
-            screen_x = effect['x'] + offset_x + TILE_SIZE // 2
-            screen_y = effect['y'] + offset_y + TILE_SIZE // 2
-            alpha = int(255 * (effect['life'] / 30))
-            color = (*effect['color'][:3], alpha)
-            arcade.draw_text(effect['text'], screen_x, screen_y, color, 16, anchor_x="center", anchor_y="center", bold=True)
+        self.camera.position = (self.camera_x + SCREEN_CENTER_X, self.camera_y + SCREEN_CENTER_Y)
+        with self.camera.activate():
+            self.fog_sprites.draw()
+            self.tile_sprites.draw()
+            self.item_sprites.draw()
+            self.enemy_sprites.draw()
+            self.hp_bar_sprites.draw()
+            self.player_sprites.draw()
+        
+        effects = self.particle_effects
+        active = effects.active()
+        if not active.size:
+            return
+        draw_text = arcade.draw_text
+        texts = effects.texts
+        rgb = effects.rgb
+        xs = (effects.x[active].astype(int) + offset_x + TILE_SIZE // 2).tolist()
+        ys = (effects.y[active].astype(int) + offset_y + TILE_SIZE // 2).tolist()
+        alphas = (255 * (effects.life[active] / PARTICLE_LIFE)).astype(int).tolist()
+        for i, screen_x, screen_y, alpha in zip(active.tolist(), xs, ys, alphas):
+            draw_text(texts[i], screen_x, screen_y, rgb[i] + (alpha,), 16, anchor_x="center", anchor_y="center", bold=True)
     
     def _draw_ui(self):
         if not self.player:
             return
         
-        panel_height = 80
-        arcade.draw_lbwh_rectangle_filled(0, SCREEN_HEIGHT - panel_height, SCREEN_WIDTH, panel_height, (20, 20, 30, 230))
-        
-        arcade.draw_text(f"{self.player.hero_class.title} Ур.{self.player.level}", 20, SCREEN_HEIGHT - 30, arcade.color.GOLD, 18, bold=True)
-        
-        self._draw_bar(20, SCREEN_HEIGHT - 55, 200, 18, self.player.hp, self.player.max_hp, arcade.color.RED, arcade.color.DARK_RED, f"ОЗ: {self.player.hp}/{self.player.max_hp}")
-        self._draw_bar(20, SCREEN_HEIGHT - 78, 200, 14, self.player.mana, self.player.max_mana, arcade.color.BLUE, arcade.color.DARK_BLUE, f"Мана: {self.player.mana}/{self.player.max_mana}")
-        self._draw_bar(240, SCREEN_HEIGHT - 55, 150, 14, self.player.exp, self.player.exp_to_next, arcade.color.YELLOW, arcade.color.DARK_GOLDENROD, f"Опыт: {self.player.exp}/{self.player.exp_to_next}")
-        
-        arcade.draw_text(f"АТК:{self.player.get_total_attack()} ЗАЩ:{self.player.get_total_defense()} МАГ:{self.player.magic}", 240, SCREEN_HEIGHT - 78, arcade.color.WHITE, 14)
-        arcade.draw_text(f"Золото: {self.player.gold}", 420, SCREEN_HEIGHT - 35, arcade.color.GOLD, 16)
-        arcade.draw_text(f"Этаж: {self.dungeon_level}/{self.max_dungeon_level}", 420, SCREEN_HEIGHT - 60, arcade.color.GRAY, 14)
-        arcade.draw_text(f"Ход: {self.turn_count}", 420, SCREEN_HEIGHT - 78, arcade.color.GRAY, 12)
-        arcade.draw_text("1:Лечение 2:Огонь I:Инвентарь", SCREEN_WIDTH - 220, SCREEN_HEIGHT - 35, arcade.color.LIGHT_GRAY, 12)
-        arcade.draw_text("WASD:Движение ПРОБЕЛ:Ждать", SCREEN_WIDTH - 210, SCREEN_HEIGHT - 55, arcade.color.LIGHT_GRAY, 12)
+        self.ui_shapes.draw()
+        
+        player = self.player
+        meters = ((player.hp, player.max_hp), (player.mana, player.max_mana), (player.exp, player.exp_to_next))
+        for (x, y, width, height, color, bg_color), (current, maximum) in zip(HUD_BARS, meters):
+            self._draw_bar(x, y, width, height, current, maximum, color, bg_color)
+        
+        values = (
+            (player.hero_class.title, player.level),
+            (player.hp, player.max_hp),
+            (player.mana, player.max_mana),
+            (player.exp, player.exp_to_next),
+            (player.get_total_attack(), player.get_total_defense(), player.magic),
+            (player.gold,),
+            (self.dungeon_level, self.max_dungeon_level),
+            (self.turn_count,),
+        )
+        shown = self.hud_values
+        for i, (text, fmt, args) in enumerate(zip(self.hud_texts, HUD_FORMATS, values)):
+            if args != shown[i]:
+                shown[i] = args
+                text.text = fmt % args
+        self.hud_batch.draw()
+        self.hud_turn_text.draw()
         
         log_height = 120
-        arcade.draw_lbwh_rectangle_filled(0, 0, SCREEN_WIDTH, log_height, (20, 20, 30, 200))
         for i, (text, color) in enumerate(self.message_log.messages):
             arcade.draw_text(text, 20, log_height - 25 - i * 18, color, 13)
     
-    def _draw_bar(self, x, y, width, height, current, maximum, color, bg_color, text):
+    def _draw_bar(self, x, y, width, height, current, maximum, color, bg_color):
         arcade.draw_lbwh_rectangle_filled(x, y - height // 2, width, height, bg_color)
         if maximum > 0:
             ratio = current / maximum
             fill_width = int(width * ratio)
             if fill_width > 0:
                 arcade.draw_lbwh_rectangle_filled(x, y - height // 2, fill_width, height, color)
-        arcade.draw_text(text, x + width // 2, y, arcade.color.WHITE, 10, anchor_x="center", anchor_y="center")
     
     def _draw_inventory(self):
-        arcade.draw_lbwh_rectangle_filled(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT, (0, 0, 0, 180))
+        self.inventory_shapes.draw()
+        left = SCREEN_CENTER_X - 250
         
-        panel_width = 500
-        panel_height = 500
-        left = SCREEN_WIDTH // 2 - panel_width // 2
-        bottom = SCREEN_HEIGHT // 2 - panel_height // 2
+        inventory = self.player.inventory
+        selected = self.selected_inventory_index
+        if 0 <= selected < min(len(inventory), 12):
+            self.inventory_highlight.position = (0, -selected * 22)
+            self.inventory_highlight.draw()
         
-        arcade.draw_lbwh_rectangle_filled(left, bottom, panel_width, panel_height, (30, 30, 45))
-        arcade.draw_lbwh_rectangle_outline(left, bottom, panel_width, panel_height, arcade.color.GOLD, 3)
-        arcade.draw_text("ИНВЕНТАРЬ", SCREEN_WIDTH // 2, bottom + panel_height - 40, arcade.color.GOLD, 24, anchor_x="center")
+        self.inventory_batch.draw()
         
-        equip_y = SCREEN_HEIGHT // 2 + 160
-        arcade.draw_text("Снаряжение:", left + 30, equip_y, arcade.color.WHITE, 14)
+        equip_y = SCREEN_CENTER_Y + 160
         
-        slot_names = {'weapon': 'Оружие', 'armor': 'Броня', 'shield': 'Щит', 'ring': 'Кольцо'}
-        for i, (slot, name) in enumerate(slot_names.items()):
-            item = self.player.equipped.get(slot)
+        gray = arcade.color.GRAY
+        for i, (slot, name) in enumerate(EQUIPMENT_SLOTS):
+            item = getattr(self.player, slot)
             item_text = item.name if item else "Пусто"
-            color = item.get_color() if item else arcade.color.GRAY
+            color = item.display_color if item else gray
             arcade.draw_text(f"{name}: {item_text}", left + 30, equip_y - 25 - i * 20, color, 12)
         
-        items_start_y = SCREEN_HEIGHT // 2 + 30
-        arcade.draw_text("Предметы:", left + 30, items_start_y, arcade.color.WHITE, 14)
-        
-        if self.player.inventory:
-            for i, item in enumerate(self.player.inventory[:12]):
+        items_start_y = SCREEN_CENTER_Y + 30
+        
+        icon_types = tuple(item.item_type for item in inventory[:12])
+        if icon_types != self.inventory_icon_types:
+            self.inventory_icon_types = icon_types
+            for i, icon in enumerate(self.inventory_icons):
+                texture = self.item_textures.get(icon_types[i]) if i < len(icon_types) else None
+                icon.visible = texture is not None
+                if texture is not None:
+                    icon.texture = texture
+                    icon.size = (24, 24)
+        self.inventory_icons.draw()
+        
+        if inventory:
+            draw_text = arcade.draw_text
+            for i, item in enumerate(inventory[:12]):
                 y = items_start_y - 25 - i * 22
-                if i == self.selected_inventory_index:
-                    arcade.draw_lbwh_rectangle_filled(left + 20, y - 10, panel_width - 40, 20, arcade.color.DARK_SLATE_GRAY)
-                
-                tex_name = self._get_item_texture_name(item.item_type)
-                if self.textures.has(tex_name):
-                    draw_texture_at(self.textures.get(tex_name), left + 35, y, 24, 24)
-                
-                text = item.name
-                if item.item_type in [ItemType.HEALTH_POTION, ItemType.MANA_POTION, ItemType.SWORD, ItemType.SHIELD, ItemType.ARMOR]:
-                    text += f" (+{item.value})"
-                arcade.draw_text(text, left + 55, y, item.get_color(), 14, anchor_y="center")
+                draw_text(item.display_text, left + 55, y, item.display_color, 14, anchor_y="center")
         else:
-            arcade.draw_text("Пусто", SCREEN_WIDTH // 2, items_start_y - 50, arcade.color.GRAY, 16, anchor_x="center")
-        
-        arcade.draw_text("Вверх/Вниз - выбор   ENTER - использовать   ESC - закрыть", SCREEN_WIDTH // 2, bottom + 20, arcade.color.GRAY, 12, anchor_x="center")
+            self.inventory_empty_text.draw()
     
     def _draw_pause(self):
-        arcade.draw_lbwh_rectangle_filled(SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2 - 100, 400, 200, (30, 30, 50, 240))
-        arcade.draw_text("ПАУЗА", SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50, arcade.color.WHITE, 36, anchor_x="center")
-        arcade.draw_text("ESC - продолжить", SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, arcade.color.GRAY, 18, anchor_x="center")
-        arcade.draw_text("Q - выйти в меню", SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 30, arcade.color.GRAY, 18, anchor_x="center")
+        self.pause_shapes.draw()
+        self.pause_batch.draw()
     
     def _draw_game_over(self):
-        arcade.draw_lbwh_rectangle_filled(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT, (0, 0, 0, 200))
-        arcade.draw_text("ВЫ ПОГИБЛИ", SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100, arcade.color.RED, 48, anchor_x="center")
+        self.game_over_batch.draw()
         
         if self.player:
-            stats = [f"Класс: {self.player.hero_class.title}", f"Уровень: {self.player.level}", f"Этаж подземелья: {self.dungeon_level}", f"Собрано золота: {self.player.gold}", f"Сделано ходов: {self.turn_count}"]
-            for i, stat in enumerate(stats):
-                arcade.draw_text(stat, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - i * 30, arcade.color.WHITE, 20, anchor_x="center")
-        
-        arcade.draw_text("Нажмите ENTER для перезапуска", SCREEN_WIDTH // 2, 150, arcade.color.GOLD, 20, anchor_x="center")
+            stats = (self.player.hero_class.title, self.player.level, self.dungeon_level, self.player.gold, self.turn_count)
+            for text, fmt, stat in zip(self.game_over_stat_texts, GAME_OVER_STAT_FORMATS, stats):
+                text.text = fmt % stat
+                text.draw()
     
     def _draw_victory(self):
-        arcade.draw_lbwh_rectangle_filled(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT, (0, 0, 0, 200))
-        arcade.draw_text("ПОБЕДА!", SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100, arcade.color.GOLD, 48, anchor_x="center")
-        arcade.draw_text("Вы покорили подземелье!", SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 40, arcade.color.WHITE, 24, anchor_x="center")
+        self.victory_batch.draw()
         
         if self.player:
-            stats = [f"Класс: {self.player.hero_class.title}", f"Финальный уровень: {self.player.level}", f"Золото: {self.player.gold}", f"Ходов: {self.turn_count}"]
-            for i, stat in enumerate(stats):
-                arcade.draw_text(stat, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 30 - i * 30, arcade.color.WHITE, 18, anchor_x="center")
-        
-        arcade.draw_text("Нажмите ENTER для возврата в меню", SCREEN_WIDTH // 2, 150, arcade.color.GOLD, 20, anchor_x="center")
+            stats = (self.player.hero_class.title, self.player.level, self.player.gold, self.turn_count)
+            for text, fmt, stat in zip(self.victory_stat_texts, VICTORY_STAT_FORMATS, stats):
+                text.text = fmt % stat
+                text.draw()
 
 
 def main():